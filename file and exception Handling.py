@@ -1,53 +1,1152 @@
 # File Read & Write Challenge
+import argparse
+import codecs
+import glob
+import hashlib
+import mmap
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+
+# Size of the write buffer used when streaming output files
+OUTPUT_BUFFER_SIZE = 1024 * 1024
+
+# Inputs at least this big are modified in parallel, in chunks of PARALLEL_CHUNK_SIZE bytes
+PARALLEL_THRESHOLD = 64 * 1024 * 1024
+PARALLEL_CHUNK_SIZE = 16 * 1024 * 1024
+
+def modify_line(line_number, line):
+    """
+    Modify a single line - returns None for lines that should be dropped
+    This example converts text to uppercase and adds line numbers
+    """
+    if line.strip():  # Only process non-empty lines
+        return f"{line_number}: {line.upper()}"
+    return None
+
 def modify_file_content(content):
     """
-    Modify the content of the file - you can customize this function
+    Modify the content of the file - you can customize modify_line
     This example converts text to uppercase and adds line numbers
     """
     lines = content.split('\n')
     modified_lines = []
     
     for i, line in enumerate(lines, 1):
-        if line.strip():  # Only process non-empty lines
-            modified_line = f"{i}: {line.upper()}"
+        modified_line = modify_line(i, line)
+        if modified_line is not None:
             modified_lines.append(modified_line)
     
     return '\n'.join(modified_lines)
 
+def stream_modify_file(input_file, output_file, preview_chars=0):
+    """
+    Streaming version of modify_file_content for files of any size
+    Reads, modifies and writes one line at a time through a buffered writer,
+    so memory use stays constant; the output is identical to writing
+    modify_file_content(input_file.read())
+    Returns (lines read, lines written, first preview_chars of the output)
+    """
+    preview = []
+    preview_length = 0
+    lines_read = 0
+    lines_written = 0
+    
+    for lines_read, line in enumerate(input_file, 1):
+        modified_line = modify_line(lines_read, line.rstrip('\n'))
+        if modified_line is None:
+            continue
+        
+        # Join with '\n' between lines but not after the last one, like modify_file_content
+        text = modified_line if lines_written == 0 else '\n' + modified_line
+        output_file.write(text)
+        lines_written += 1
+        
+        if preview_length < preview_chars:
+            preview.append(text[:preview_chars - preview_length])
+            preview_length += len(preview[-1])
+    
+    return lines_read, lines_written, ''.join(preview)
+
+def parallel_modify_file(input_filename, output_file, workers=None, chunk_size=PARALLEL_CHUNK_SIZE):
+    """
+    Parallel version of stream_modify_file for multi-GB UTF-8 files
+    The input is split into chunks at newline boundaries and every chunk is
+    modified in its own process. A first, cheap pass counts the line breaks
+    in each chunk so every chunk knows the number of its first line; the
+    results are then written back in order with only a few chunks in memory
+    Returns (lines read, lines written)
+    """
+    chunks = _chunk_boundaries(input_filename, chunk_size)
+    workers = workers or os.cpu_count() or 1
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        starts = [start for start, _ in chunks]
+        ends = [end for _, end in chunks]
+        break_counts = list(executor.map(_count_line_breaks, [input_filename] * len(chunks), starts, ends))
+        
+        # Line numbers carry on from one chunk to the next
+        first_lines = []
+        line_number = 1
+        for count in break_counts:
+            first_lines.append(line_number)
+            line_number += count
+        
+        lines_written = 0
+        in_flight = deque()
+        
+        def write_next():
+            nonlocal lines_written
+            text, written = in_flight.popleft().result()
+            if written:
+                output_file.write(text if lines_written == 0 else '\n' + text)
+                lines_written += written
+        
+        for (start, end), first_line in zip(chunks, first_lines):
+            in_flight.append(executor.submit(_modify_chunk, input_filename, start, end, first_line))
+            if len(in_flight) >= workers * 2:
+                write_next()
+        while in_flight:
+            write_next()
+    
+    # A last line without a line break still counts as a line
+    lines_read = line_number - 1
+    if chunks and not _ends_with_line_break(input_filename):
+        lines_read += 1
+    return lines_read, lines_written
+
+def _chunk_boundaries(filename, chunk_size):
+    """
+    Splits a file into (start, end) byte ranges of about chunk_size bytes,
+    each ending just after a newline so no line is cut in two
+    """
+    size = os.path.getsize(filename)
+    chunks = []
+    with open(filename, 'rb') as file:
+        start = 0
+        while start < size:
+            end = min(start + chunk_size, size)
+            if end < size:
+                file.seek(end)
+                end += len(file.readline())
+            chunks.append((start, end))
+            start = end
+    return chunks
+
+def _read_chunk(filename, start, end):
+    with open(filename, 'rb') as file:
+        file.seek(start)
+        return file.read(end - start)
+
+def _count_line_breaks(filename, start, end):
+    """
+    Counts line breaks in a byte range the way text mode reads them:
+    '\n', '\r' and '\r\n' each end one line
+    """
+    data = _read_chunk(filename, start, end)
+    return data.count(b'\n') + data.count(b'\r') - data.count(b'\r\n')
+
+def _modify_chunk(filename, start, end, first_line):
+    """
+    Modifies the lines in one byte range, numbering them from first_line
+    Returns (modified text, number of lines written)
+    """
+    text = _read_chunk(filename, start, end).decode('utf-8')
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    
+    modified_lines = []
+    for i, line in enumerate(text.split('\n'), first_line):
+        modified_line = modify_line(i, line)
+        if modified_line is not None:
+            modified_lines.append(modified_line)
+    return '\n'.join(modified_lines), len(modified_lines)
+
+def _ends_with_line_break(filename):
+    with open(filename, 'rb') as file:
+        file.seek(-1, os.SEEK_END)
+        return file.read(1) in (b'\n', b'\r')
+
+@contextmanager
+def atomic_output(output_filename):
+    """
+    Opens a temporary file next to output_filename for writing, and moves it
+    over output_filename only once the block finishes without an error
+    The input is never truncated while it is read, even when it is also the
+    output, and a failed run leaves no half-written output behind
+    """
+    directory = os.path.dirname(os.path.abspath(output_filename))
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(output_filename)}.", suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', buffering=OUTPUT_BUFFER_SIZE) as output_file:
+            yield output_file
+        # mkstemp files are private - give the output the permissions open() would have
+        if os.path.exists(output_filename):
+            shutil.copymode(output_filename, temp_path)
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(temp_path, 0o666 & ~umask)
+        os.replace(temp_path, output_filename)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
 def file_read_write():
     """Read a file and write a modified version to a new file"""
     try:
-        # Read from original file
+        # Open the original file - it is read line by line below, never all at once
         input_filename = input("Enter the input filename: ")
         
-        with open(input_filename, 'r', encoding='utf-8') as file:
-            original_content = file.read()
+        # Binary files are rejected here, before anything is read
+        input_file = open_text(input_filename)
+        print(f"Successfully opened {input_filename}")
         
-        print(f"Successfully read from {input_filename}")
-        
-        # Modify the content
-        modified_content = modify_file_content(original_content)
+        # Modify the content while writing it to the new file
+        try:
+            output_filename = input("Enter the output filename: ")
+        except BaseException:
+            input_file.close()
+            raise
+        input_size = os.fstat(input_file.fileno()).st_size
         
-        # Write to new file
-        output_filename = input("Enter the output filename: ")
+        # The input is closed before the finished output replaces the output file
+        with atomic_output(output_filename) as output_file, input_file:
+            if (input_size >= PARALLEL_THRESHOLD and (os.cpu_count() or 1) > 1
+                    and input_file.encoding == 'utf-8'):
+                print(f"Large file ({input_size:,} bytes) - modifying it in parallel...")
+                lines_read, lines_written = parallel_modify_file(input_filename, output_file)
+                preview = None
+            else:
+                lines_read, lines_written, preview = stream_modify_file(input_file, output_file,
+                                                                        preview_chars=201)
         
-        with open(output_filename, 'w', encoding='utf-8') as file:
-            file.write(modified_content)
+        if preview is None:
+            with open(output_filename, 'r', encoding='utf-8') as output_file:
+                preview = output_file.read(201)
         
+        print(f"Successfully read {lines_read} lines from {input_filename}")
         print(f"Successfully wrote modified content to {output_filename}")
         
         # Display preview
         print("\nPreview of modified content:")
         print("-" * 40)
-        print(modified_content[:200] + "..." if len(modified_content) > 200 else modified_content)
+        print(preview[:200] + "..." if len(preview) > 200 else preview)
         
     except FileNotFoundError:
         print("Error: The input file was not found.")
     except PermissionError:
         print("Error: Permission denied to read/write the file.")
+    except BinaryFileError:
+        print("Error: The input file is a binary file, not text.")
+    except UnicodeDecodeError:
+        print("Error: The input file could not be decoded as text.")
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
       
+# Encoding Probe 🔬
+
+# How many bytes at the start of a file are looked at to guess its encoding
+PROBE_SIZE = 4096
+
+# Share of control bytes in the probe above which a file is treated as binary
+BINARY_CONTROL_RATIO = 0.1
+
+# Byte order marks, longest first (the UTF-32 LE mark starts with the UTF-16 LE one)
+_BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'), (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'), (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# Control bytes that do not normally occur in text (tabs, line breaks, form feeds and escapes do)
+_BINARY_BYTES = bytes(b for b in range(32) if b not in b'\t\n\r\x0b\x0c\x1b') + b'\x7f'
+
+class BinaryFileError(UnicodeDecodeError):
+    """
+    Raised when the start of a file shows it is binary, before the rest is read
+    It is a UnicodeDecodeError, so every handler for undecodable files
+    already catches it
+    """
+    
+    def __init__(self, filename, sample):
+        super().__init__('binary', sample, 0, len(sample), f"'{filename}' looks like a binary file")
+        self.filename = filename
+    
+    def __str__(self):
+        return self.reason
+    
+    def __reduce__(self):
+        # Rebuilt from its own arguments, so it can be pickled back from a worker process
+        return type(self), (self.filename, self.object)
+
+def detect_encoding(filename):
+    """
+    Guesses the encoding of a text file from its first PROBE_SIZE bytes
+    A byte order mark wins; otherwise UTF-16 without a mark is recognised
+    by its NUL bytes, then UTF-8 is tried, then cp1252 and finally latin-1
+    Raises BinaryFileError if the probe looks binary
+    """
+    with open(filename, 'rb') as file:
+        sample = file.read(PROBE_SIZE)
+    complete = len(sample) < PROBE_SIZE
+    
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+    
+    if b'\x00' in sample:
+        # Mostly-ASCII UTF-16 has a NUL in every other byte and nowhere else
+        half = len(sample) // 2
+        even, odd = sample[0::2].count(0), sample[1::2].count(0)
+        if odd > half * 0.4 and even < half * 0.05:
+            return 'utf-16-le'
+        if even > half * 0.4 and odd < half * 0.05:
+            return 'utf-16-be'
+        raise BinaryFileError(filename, sample)
+    
+    controls = len(sample) - len(sample.translate(None, _BINARY_BYTES))
+    if controls > len(sample) * BINARY_CONTROL_RATIO:
+        raise BinaryFileError(filename, sample)
+    
+    try:
+        # A probe that stops mid-file may cut the last character in two
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=complete)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    try:
+        sample.decode('cp1252')
+        return 'cp1252'
+    except UnicodeDecodeError:
+        return 'latin-1'  # Decodes any byte
+
+def open_text(filename):
+    """
+    Opens a text file for reading in the encoding detect_encoding finds
+    Raises BinaryFileError straight away for binary files
+    """
+    return open(filename, 'r', encoding=detect_encoding(filename))
+
+def _ascii_compatible(encoding):
+    """
+    True if b'\\n' in the raw bytes is always a line break in this encoding
+    """
+    return not encoding.startswith(('utf-16', 'utf-32'))
+
+# Head, Tail & Follow 📜
+
+# Preview lines longer than this are cut, so one giant line cannot be read whole
+PREVIEW_LINE_CHARS = 10000
+
+# tail_lines reads backwards from the end in blocks of this many bytes
+TAIL_BLOCK_SIZE = 64 * 1024
+
+def head_lines(filename, count=5, max_line_chars=PREVIEW_LINE_CHARS):
+    """
+    Returns (lines, more): the first `count` lines of a UTF-8 text file and
+    whether anything follows them
+    Only those lines are read. A line longer than max_line_chars is cut
+    short and ends the preview
+    """
+    lines = []
+    with open_text(filename) as file:
+        while len(lines) < count:
+            line = file.readline(max_line_chars + 1)
+            if line.endswith('\n'):
+                lines.append(line[:-1])
+            elif len(line) > max_line_chars:
+                lines.append(line[:max_line_chars] + "...")
+                return lines, True
+            else:
+                if line:
+                    lines.append(line)
+                return lines, False
+        return lines, file.read(1) != ''
+
+def tail_lines(filename, count=10, block_size=TAIL_BLOCK_SIZE):
+    """
+    Returns the last `count` lines of a text file
+    Blocks are read backwards from the end until enough line breaks are
+    found, so the cost depends on the lines returned, not the file size
+    (UTF-16 and UTF-32 files are read forwards instead)
+    """
+    encoding = detect_encoding(filename)
+    if count <= 0:
+        return []
+    if not _ascii_compatible(encoding):
+        with open(filename, 'r', encoding=encoding) as file:
+            return [line.rstrip('\n') for line in deque(file, maxlen=count)]
+    
+    with open(filename, 'rb') as file:
+        end = file.seek(0, os.SEEK_END)
+        start = end
+        newlines = 0
+        # One extra '\n' guarantees the first line in the block is complete
+        while start > 0 and newlines <= count:
+            step = min(block_size, start)
+            start -= step
+            file.seek(start)
+            newlines += file.read(step).count(b'\n')
+        file.seek(start)
+        data = file.read(end - start)
+    
+    if start > 0:
+        data = data[data.index(b'\n') + 1:]
+    return data.decode(encoding).splitlines()[-count:]
+
+def follow_file(filename, interval=0.5):
+    """
+    Yields lines as they are appended to a growing file, like `tail -f`
+    Starts at the current end of the file. If the file is truncated or
+    replaced (log rotation), following carries on from the start of the
+    new file. Runs until the caller stops iterating
+    """
+    file = open(filename, 'rb')
+    try:
+        file.seek(0, os.SEEK_END)
+        inode = os.fstat(file.fileno()).st_ino
+        # Appends can end mid-character, so decode incrementally
+        decoder = _incremental_decoder(filename, from_start=False)
+        pending = ''
+        while True:
+            data = file.read(TAIL_BLOCK_SIZE)
+            if data:
+                *complete, pending = (pending + decoder.decode(data)).split('\n')
+                for line in complete:
+                    yield line.rstrip('\r')
+                continue
+            
+            try:
+                info = os.stat(filename)
+            except FileNotFoundError:
+                info = None  # Rotated away and not recreated yet
+            if info is not None and (info.st_ino != inode or info.st_size < file.tell()):
+                file.close()
+                file = open(filename, 'rb')
+                inode = os.fstat(file.fileno()).st_ino
+                decoder = _incremental_decoder(filename, from_start=True)
+                pending = ''
+                continue
+            time.sleep(interval)
+    finally:
+        file.close()
+
+def _incremental_decoder(filename, from_start):
+    """
+    Incremental decoder for the encoding of filename
+    Decoding from the middle of a UTF-16/32 file with a byte order mark
+    needs the byte order the mark announced
+    """
+    encoding = detect_encoding(filename)
+    if encoding in ('utf-16', 'utf-32') and not from_start:
+        with open(filename, 'rb') as file:
+            little_endian = file.read(2) == codecs.BOM_UTF16_LE   # Also the start of the UTF-32 LE mark
+        encoding += '-le' if little_endian else '-be'
+    return codecs.getincrementaldecoder(encoding)(errors='replace')
+
+# File Statistics Engine 📊
+
+# Files are scanned in windows of about this many bytes, each ending at a newline
+STATS_WINDOW_SIZE = 1024 * 1024
+
+# Table mapping every byte to b' ' if it is ASCII whitespace for str.split(), else to b'x'
+_WORD_TABLE = bytes(0x20 if chr(b).isspace() else ord('x') for b in range(128)) + b'x' * 128
+
+# Non-ASCII whitespace for str.split(), UTF-8 encoded (only looked for in non-ASCII windows)
+_UNICODE_SPACES = tuple(chr(c).encode('utf-8') for c in (
+    0x85, 0xa0, 0x1680, *range(0x2000, 0x200b), 0x2028, 0x2029, 0x202f, 0x205f, 0x3000))
+
+# Everything str.splitlines() ends a line at, UTF-8 encoded
+_LINE_BREAKS = (b'\n', b'\r', b'\x0b', b'\x0c', b'\x1c', b'\x1d', b'\x1e')
+_UNICODE_LINE_BREAKS = ('\x85'.encode('utf-8'), '\u2028'.encode('utf-8'), '\u2029'.encode('utf-8'))
+_TEXT_LINE_BREAKS = '\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029'
+
+# Where file statistics are kept between runs (see StatsCache)
+STATS_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.file_stats_cache.sqlite3')
+
+# How many bytes before the old end of a grown file must be unchanged to scan only the tail
+APPEND_CHECK_SIZE = 4096
+
+class StatsCache:
+    """
+    Persistent file-statistics cache kept in a single SQLite file
+    Entries are keyed by absolute path and only trusted while the file's
+    size, mtime and inode are unchanged. A file that has only been appended
+    to (same inode, and the bytes just before the old end are unchanged)
+    is brought up to date by scanning just the new tail. Files in other
+    encodings than UTF-8 keep only their final counts (no append check), so
+    any change to them means a full recount. Once there are more than
+    max_entries entries the least recently used are evicted
+    """
+    
+    def __init__(self, path=STATS_CACHE_PATH, max_entries=10000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS file_stats ("
+                "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, inode INTEGER, "
+                "characters INTEGER, breaks INTEGER, words INTEGER, after_space INTEGER, "
+                "tail BLOB, append_check TEXT, last_used REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS file_stats_used ON file_stats (last_used)")
+    
+    def get_stats(self, filename):
+        """
+        Returns the statistics of filename, from the cache when still valid
+        """
+        key = os.path.abspath(filename)
+        info = os.stat(filename)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT size, mtime_ns, inode, characters, breaks, words, after_space, tail, append_check "
+                "FROM file_stats WHERE path = ?", (key,)
+            ).fetchone()
+        
+        if row is not None:
+            size, mtime_ns, inode, characters, breaks, words, after_space, tail, append_check = row
+            scan = {'bytes': size, 'characters': characters, 'breaks': breaks, 'words': words,
+                    'after_space': bool(after_space), 'tail': tail}
+            if inode != info.st_ino:
+                scan = None
+            elif size == info.st_size and mtime_ns == info.st_mtime_ns:
+                self._touch(key)
+                if append_check is None:   # Final counts of a file that is not UTF-8
+                    return {'bytes': size, 'characters': characters, 'lines': breaks, 'words': words}
+                return _stats_from_scan(scan)
+            elif (info.st_size > size and append_check is not None
+                    and append_check == _append_check(filename, size)):
+                scan = _scan_file(filename, start=size, scan=scan)
+            else:
+                scan = None
+        else:
+            scan = None
+        
+        if scan is None:
+            encoding = detect_encoding(filename)
+            if encoding != 'utf-8':
+                # Only the UTF-8 byte scan can be resumed - the lines go in the breaks column
+                stats = _text_stats(filename, encoding)
+                final = {'bytes': stats['bytes'], 'characters': stats['characters'], 'breaks': stats['lines'],
+                         'words': stats['words'], 'after_space': True, 'tail': None}
+                self._store(key, info, final, None)
+                return stats
+            scan = _scan_file(filename)
+        self._store(key, info, scan, _append_check(filename, scan['bytes']))
+        return _stats_from_scan(scan)
+    
+    def _touch(self, key):
+        with self._lock, self._db:
+            self._db.execute("UPDATE file_stats SET last_used = ? WHERE path = ?", (time.time(), key))
+    
+    def _store(self, key, info, scan, append_check):
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO file_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, scan['bytes'], info.st_mtime_ns, info.st_ino, scan['characters'], scan['breaks'],
+                 scan['words'], int(scan['after_space']), scan['tail'], append_check, time.time())
+            )
+            count = self._db.execute("SELECT COUNT(*) FROM file_stats").fetchone()[0]
+            if count > self.max_entries:
+                self._db.execute(
+                    "DELETE FROM file_stats WHERE path IN "
+                    "(SELECT path FROM file_stats ORDER BY last_used LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+
+def _append_check(filename, end):
+    """
+    Fingerprint of the APPEND_CHECK_SIZE bytes before `end`, used to tell
+    an appended file from one that was rewritten
+    """
+    with open(filename, 'rb') as file:
+        file.seek(max(end - APPEND_CHECK_SIZE, 0))
+        return hashlib.sha1(file.read(min(end, APPEND_CHECK_SIZE))).hexdigest()
+
+# Shared StatsCache, opened on first use
+_stats_cache = None
+
+def get_file_stats(filename):
+    """
+    Returns the statistics of a UTF-8 text file (see compute_file_stats),
+    served from the persistent StatsCache when the file has not changed
+    """
+    global _stats_cache
+    if _stats_cache is None:
+        try:
+            _stats_cache = StatsCache()
+        except sqlite3.Error:
+            # No writable cache location - just compute the statistics every time
+            return compute_file_stats(filename)
+    return _stats_cache.get_stats(filename)
+
+def compute_file_stats(filename):
+    """
+    Computes bytes, characters, lines and words of a text file in one pass
+    UTF-8 files are memory-mapped and scanned in windows with bytes.count
+    and bytes.translate, so no lists of lines or words are ever built;
+    other encodings found by detect_encoding are decoded in windows.
+    Results match len(content), len(content.splitlines()) and
+    len(content.split()) for content read in text mode ('\r\n' counts as one
+    character). Raises BinaryFileError for binary files and
+    UnicodeDecodeError if the file does not decode
+    """
+    encoding = detect_encoding(filename)
+    if encoding != 'utf-8':
+        return _text_stats(filename, encoding)
+    return _stats_from_scan(_scan_file(filename))
+
+def _text_stats(filename, encoding):
+    """
+    compute_file_stats for encodings other than UTF-8, decoding the file in
+    text-mode windows
+    """
+    stats = {'bytes': os.path.getsize(filename), 'characters': 0, 'lines': 0, 'words': 0}
+    after_space = True
+    last = ''
+    with open(filename, 'r', encoding=encoding) as file:
+        while True:
+            text = file.read(STATS_WINDOW_SIZE)
+            if not text:
+                break
+            stats['characters'] += len(text)
+            stats['lines'] += sum(text.count(c) for c in _TEXT_LINE_BREAKS)
+            words = len(text.split())
+            if words and not after_space and not text[0].isspace():
+                words -= 1  # The window starts inside a word counted already
+            stats['words'] += words
+            after_space = text[-1].isspace()
+            last = text[-1]
+    # A last line without a line break still counts as a line
+    if last and last not in _TEXT_LINE_BREAKS:
+        stats['lines'] += 1
+    return stats
+
+def _scan_file(filename, start=0, scan=None):
+    """
+    Scans filename from byte `start` on, carrying on the counts of `scan`
+    (an earlier result for the bytes before start)
+    Returns the raw counts: bytes, characters, line breaks, words, whether
+    the text ended in whitespace and its last three bytes
+    """
+    if scan is None:
+        scan = {'bytes': 0, 'characters': 0, 'breaks': 0, 'words': 0,
+                'after_space': True, 'tail': b''}   # A file starts as if after whitespace
+    else:
+        scan = dict(scan)
+    
+    with open(filename, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        if size <= start:
+            return scan
+        
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            # A '\r' at the old end and '\n' at the new start are one line break
+            if scan['tail'].endswith(b'\r') and data[start:start + 1] == b'\n':
+                scan['breaks'] -= 1
+                scan['characters'] -= 1
+            
+            while start < size:
+                end = data.find(b'\n', min(start + STATS_WINDOW_SIZE, size) - 1)
+                end = size if end == -1 else end + 1
+                scan['after_space'] = _scan_window(data[start:end], scan, scan['after_space'])
+                start = end
+            
+            scan['tail'] = (scan['tail'] + data[max(size - 3, 0):size])[-3:]
+    return scan
+
+def _stats_from_scan(scan):
+    """
+    Turns raw scan counts into the statistics dict
+    """
+    lines = scan['breaks']
+    # A last line without a line break still counts as a line
+    if scan['bytes'] and not scan['tail'].endswith(_LINE_BREAKS + _UNICODE_LINE_BREAKS):
+        lines += 1
+    return {'bytes': scan['bytes'], 'characters': scan['characters'], 'lines': lines, 'words': scan['words']}
+
+def _scan_window(window, stats, after_space):
+    """
+    Adds one window's counts to stats
+    Returns whether the window ends in whitespace (for the next window's word count)
+    """
+    stats['bytes'] += len(window)
+    crlf = window.count(b'\r\n')
+    breaks = sum(window.count(line_break) for line_break in _LINE_BREAKS) - crlf
+    
+    if window.isascii():
+        characters = len(window)
+    else:
+        # Decoding checks the window is valid UTF-8 and gives the character count
+        characters = len(window.decode('utf-8'))
+        breaks += sum(window.count(line_break) for line_break in _UNICODE_LINE_BREAKS)
+        for space in _UNICODE_SPACES:
+            if space in window:
+                window = window.replace(space, b' ')
+    
+    # A word starts wherever a non-space byte follows a space
+    flags = window.translate(_WORD_TABLE)
+    words = flags.count(b' x')
+    if after_space and flags.startswith(b'x'):
+        words += 1
+    
+    stats['characters'] += characters - crlf
+    stats['breaks'] += breaks
+    stats['words'] += words
+    return flags.endswith(b' ')
+
+# Search Index 🔎
+
+class FileIndex:
+    """
+    Search index for one text file, built in a single pass and then reused
+    for every search. It stores the byte offset of each line and a map from
+    each word to the lines containing it; a trigram index over the distinct
+    words is added on the first substring search. A search only reads the
+    candidate lines the index points to instead of rescanning the file
+    """
+    
+    def __init__(self, filename):
+        self.filename = filename
+        self.encoding = detect_encoding(filename)
+        if not _ascii_compatible(self.encoding):
+            raise ValueError(f"cannot index {self.encoding} files")
+        self.line_offsets = array('q')
+        self.word_lines = {}   # word -> array of line numbers, ascending
+        self._vocabulary = None
+        self._trigrams = None
+        
+        with open(filename, 'rb') as file:
+            offset = 0
+            for line_number, raw_line in enumerate(file, 1):
+                self.line_offsets.append(offset)
+                offset += len(raw_line)
+                for word in set(raw_line.decode(self.encoding).split()):
+                    lines = self.word_lines.get(word)
+                    if lines is None:
+                        self.word_lines[word] = array('I', [line_number])
+                    else:
+                        lines.append(line_number)
+    
+    @property
+    def line_count(self):
+        return len(self.line_offsets)
+    
+    def search(self, term):
+        """
+        Finds every line containing term
+        Returns (total occurrences, list of (line number, occurrences, line text))
+        Occurrences are counted like str.count, line by line
+        """
+        matches = []
+        total = 0
+        with open(self.filename, 'rb') as file:
+            for line_number in self._candidate_lines(term):
+                text = self._read_line(file, line_number)
+                occurrences = text.count(term)
+                if occurrences:
+                    matches.append((line_number, occurrences, text))
+                    total += occurrences
+        return total, matches
+    
+    def read_line(self, line_number):
+        """Returns one line (1-based) without its line break"""
+        with open(self.filename, 'rb') as file:
+            return self._read_line(file, line_number)
+    
+    def _read_line(self, file, line_number):
+        file.seek(self.line_offsets[line_number - 1])
+        return file.readline().decode(self.encoding).rstrip('\r\n')
+    
+    def context(self, line_number, radius=1):
+        """Returns [(line number, text)] for the lines around line_number"""
+        first = max(1, line_number - radius)
+        last = min(self.line_count, line_number + radius)
+        with open(self.filename, 'rb') as file:
+            return [(number, self._read_line(file, number)) for number in range(first, last + 1)]
+    
+    def _candidate_lines(self, term):
+        """
+        Returns the sorted line numbers that can contain term
+        Every whitespace-separated piece of the term must be part of a word
+        on the line: a middle piece is a whole word, the first piece ends a
+        word, the last piece starts one, and a single piece can be anywhere
+        """
+        tokens = term.split()
+        if not tokens or '\n' in term or '\r' in term:
+            return range(1, self.line_count + 1)  # Nothing to narrow by - check every line
+        
+        candidates = None
+        for position, token in enumerate(tokens):
+            if len(tokens) == 1:
+                words = self._words_containing(token, lambda word: token in word)
+            elif position == 0:
+                words = self._words_containing(token, lambda word: word.endswith(token))
+            elif position == len(tokens) - 1:
+                words = self._words_containing(token, lambda word: word.startswith(token))
+            else:
+                words = [token] if token in self.word_lines else []
+            
+            lines = set()
+            for word in words:
+                lines.update(self.word_lines[word])
+            candidates = lines if candidates is None else candidates & lines
+            if not candidates:
+                return []
+        return sorted(candidates)
+    
+    def _words_containing(self, token, matches):
+        """
+        Returns the indexed words for which matches(word) is true
+        Uses the trigram index to skip words that cannot contain token
+        """
+        if self._trigrams is None:
+            self._build_trigrams()
+        
+        if len(token) < 3:
+            pool = self._vocabulary
+        else:
+            pool = None
+            for i in range(len(token) - 2):
+                ids = self._trigrams.get(token[i:i + 3])
+                if ids is None:
+                    return []
+                pool = set(ids) if pool is None else pool.intersection(ids)
+            pool = (self._vocabulary[word_id] for word_id in pool)
+        return [word for word in pool if matches(word)]
+    
+    def _build_trigrams(self):
+        self._vocabulary = list(self.word_lines)
+        self._trigrams = {}
+        for word_id, word in enumerate(self._vocabulary):
+            for trigram in {word[i:i + 3] for i in range(len(word) - 2)}:
+                ids = self._trigrams.get(trigram)
+                if ids is None:
+                    self._trigrams[trigram] = array('I', [word_id])
+                else:
+                    ids.append(word_id)
+
+# Multi-Pattern Search 🧵
+
+class MultiPatternMatcher:
+    """
+    Aho-Corasick automaton that finds many literal patterns in a single pass
+    over the text, however many patterns there are. Matching is done within
+    lines (patterns cannot span a line break) and overlapping occurrences
+    are all counted
+    """
+    
+    def __init__(self, patterns, ignore_case=False):
+        self.ignore_case = ignore_case
+        self.patterns = list(dict.fromkeys(p for p in patterns if p))
+        
+        # Build the trie of all patterns
+        goto = [{}]
+        outputs = [[]]
+        for pattern_id, pattern in enumerate(self.patterns):
+            state = 0
+            for char in (pattern.lower() if ignore_case else pattern):
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    outputs.append([])
+                state = next_state
+            outputs[state].append(pattern_id)
+        
+        # Breadth-first, add failure links and fold them into full transition
+        # tables, so scanning needs exactly one dict lookup per character
+        fail = [0] * len(goto)
+        transitions = [None] * len(goto)
+        transitions[0] = dict(goto[0])
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            transitions[state] = {**transitions[fail[state]], **goto[state]}
+            for char, next_state in goto[state].items():
+                fail[next_state] = transitions[fail[state]].get(char, 0)
+                outputs[next_state] = outputs[next_state] + outputs[fail[next_state]]
+                queue.append(next_state)
+        
+        self._transitions = transitions
+        self._outputs = [tuple(output) for output in outputs]
+    
+    def scan(self, lines, max_locations=100):
+        """
+        Scans an iterable of lines (e.g. an open text file)
+        Returns (counts, locations): counts[i] is how often pattern i occurs,
+        locations[i] holds up to max_locations (line, column) pairs, 1-based
+        """
+        counts = [0] * len(self.patterns)
+        locations = [[] for _ in self.patterns]
+        lengths = [len(pattern) for pattern in self.patterns]
+        transitions = self._transitions
+        outputs = self._outputs
+        
+        for line_number, line in enumerate(lines, 1):
+            if self.ignore_case:
+                line = line.lower()
+            state = 0
+            for column, char in enumerate(line, 1):
+                state = transitions[state].get(char, 0)
+                if outputs[state]:
+                    for pattern_id in outputs[state]:
+                        counts[pattern_id] += 1
+                        if len(locations[pattern_id]) < max_locations:
+                            locations[pattern_id].append((line_number, column - lengths[pattern_id] + 1))
+        return counts, locations
+
+def search_files(patterns, paths, ignore_case=False, workers=None, max_locations=100):
+    """
+    Searches files and whole directory trees for many patterns at once
+    Each file is streamed through one MultiPatternMatcher in a process pool,
+    so every file is read once no matter how many patterns there are
+    Returns a report dict with per-pattern totals and per-file results;
+    files that cannot be read are listed under 'errors' with the reason
+    """
+    files = list(_iter_files(paths))
+    matcher = MultiPatternMatcher(patterns, ignore_case)
+    report = {
+        'patterns': matcher.patterns,
+        'files_searched': len(files),
+        'totals': {pattern: 0 for pattern in matcher.patterns},
+        'files': {},
+        'errors': {},
+    }
+    if not files or not matcher.patterns:
+        return report
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_search_worker,
+                             initargs=(matcher, max_locations)) as executor:
+        futures = {executor.submit(_search_one_file, filename): filename for filename in files}
+        for future in as_completed(futures):
+            filename = futures[future]
+            result, error = future.result()
+            if error:
+                report['errors'][filename] = error
+                continue
+            counts, locations = result
+            found = {}
+            for pattern, count, where in zip(matcher.patterns, counts, locations):
+                if count:
+                    report['totals'][pattern] += count
+                    found[pattern] = {'count': count, 'locations': where}
+            if found:
+                report['files'][filename] = found
+    return report
+
+def _iter_files(paths):
+    """
+    Yields every file in paths, expanding glob patterns and walking into directories
+    """
+    for path in ([paths] if isinstance(paths, str) else paths):
+        if glob.has_magic(path):
+            matches = sorted(glob.glob(path, recursive=True))
+            yield from _iter_files(matches) if matches else [path]
+        elif os.path.isdir(path):
+            for folder, _, names in os.walk(path):
+                for name in sorted(names):
+                    yield os.path.join(folder, name)
+        else:
+            yield path
+
+# Each search worker process builds its state once instead of once per file
+_search_matcher = None
+_search_max_locations = 100
+
+def _init_search_worker(matcher, max_locations):
+    global _search_matcher, _search_max_locations
+    _search_matcher = matcher
+    _search_max_locations = max_locations
+
+def _search_one_file(filename):
+    """
+    Runs the worker's matcher over one file
+    Returns (result, None) or (None, error description)
+    """
+    try:
+        with open_text(filename) as file:
+            return _search_matcher.scan(file, _search_max_locations), None
+    except Exception as e:
+        return None, _describe_error(e)
+
+def _describe_error(error):
+    """
+    Short reason a file could not be processed, using the same
+    classification as safe_file_operations
+    """
+    if isinstance(error, FileNotFoundError):
+        return "file not found"
+    if isinstance(error, PermissionError):
+        return "permission denied"
+    if isinstance(error, BinaryFileError):
+        return "binary file"
+    if isinstance(error, UnicodeDecodeError):
+        return "cannot decode (binary file?)"
+    if isinstance(error, IsADirectoryError):
+        return "is a directory"
+    return str(error)
+
+def multi_pattern_search(default_path):
+    """
+    Interactive multi-pattern search over a file or a directory tree
+    """
+    print("Enter the patterns to search for (one per line). Type 'done' when finished.")
+    patterns = []
+    while True:
+        pattern = input("Pattern (or 'done' to finish): ")
+        if pattern.lower() == 'done':
+            break
+        if pattern:
+            patterns.append(pattern)
+    if not patterns:
+        print("❌ No patterns entered.")
+        return
+    
+    path = input(f"File or folder to search (Enter for '{default_path}'): ").strip() or default_path
+    ignore_case = input("Ignore case? (y/n): ").lower() == 'y'
+    
+    report = search_files(patterns, path, ignore_case=ignore_case)
+    print(f"\n🔍 Searched {report['files_searched']} file(s)")
+    for pattern, total in report['totals'].items():
+        print(f"  '{pattern}': {total} occurrence(s)")
+    for filename, found in sorted(report['files'].items()):
+        print(f"\n📄 {filename}")
+        for pattern, result in found.items():
+            where = ", ".join(f"{line}:{column}" for line, column in result['locations'][:5])
+            more = " ..." if result['count'] > 5 else ""
+            print(f"  '{pattern}' x{result['count']} at line:column {where}{more}")
+    for filename, error in sorted(report['errors'].items()):
+        print(f"⚠️  Skipped {filename}: {error}")
+
+# Batch Analysis 📦
+def analyze_files(paths, stats=True, output_dir=None, workers=None):
+    """
+    Non-interactive analysis of many files at once
+    paths can be files, directories (walked recursively) or glob patterns.
+    Every file gets its statistics computed and, if output_dir is given,
+    its modify_file_content version written to the same relative path
+    under output_dir. Files are processed in a process pool
+    Returns a report dict with per-file results, aggregate totals and
+    per-file errors classified like safe_file_operations does
+    """
+    started = time.perf_counter()
+    files = list(_iter_files(paths))
+    if output_dir:
+        # Never feed our own output back in when it lies inside an input directory
+        output_root = os.path.abspath(output_dir) + os.sep
+        files = [f for f in files if not os.path.abspath(f).startswith(output_root)]
+    outputs = _output_paths(files, output_dir) if output_dir else {}
+    
+    report = {
+        'files': len(files),
+        'results': {},
+        'errors': {},
+        'totals': {'bytes': 0, 'characters': 0, 'lines': 0, 'words': 0, 'lines_written': 0},
+        'elapsed': 0.0,
+    }
+    if files:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(_analyze_one_file, filename, stats, outputs.get(filename)): filename
+                       for filename in files}
+            for future in as_completed(futures):
+                filename = futures[future]
+                result, error = future.result()
+                if error:
+                    report['errors'][filename] = error
+                    continue
+                report['results'][filename] = result
+                for key, value in result.get('stats', {}).items():
+                    report['totals'][key] += value
+                report['totals']['lines_written'] += result.get('lines_written', 0)
+    
+    report['elapsed'] = time.perf_counter() - started
+    return report
+
+def _output_paths(files, output_dir):
+    """
+    Maps each file to its place under output_dir, keeping the folder layout
+    below the files' common parent directory
+    """
+    if not files:
+        return {}
+    base = os.path.commonpath([os.path.dirname(os.path.abspath(f)) for f in files])
+    return {f: os.path.join(output_dir, os.path.relpath(os.path.abspath(f), base)) for f in files}
+
+def _analyze_one_file(filename, stats, output_filename):
+    """
+    Computes the statistics of one file and/or writes its modified copy
+    Returns (result, None) or (None, error description)
+    """
+    try:
+        result = {}
+        if stats:
+            result['stats'] = get_file_stats(filename)
+        if output_filename:
+            os.makedirs(os.path.dirname(output_filename) or '.', exist_ok=True)
+            with atomic_output(output_filename) as output_file, open_text(filename) as input_file:
+                _, result['lines_written'], _ = stream_modify_file(input_file, output_file)
+            result['output'] = output_filename
+        return result, None
+    except Exception as e:
+        return None, _describe_error(e)
+
+def print_analysis_report(report):
+    """
+    Prints the aggregate results of analyze_files
+    """
+    totals = report['totals']
+    print(f"\n📦 Analyzed {len(report['results'])} of {report['files']} file(s) in {report['elapsed']:.2f}s")
+    print(f"📊 Total bytes: {totals['bytes']:,}")
+    print(f"📊 Total characters: {totals['characters']:,}")
+    print(f"📝 Total lines: {totals['lines']:,}")
+    print(f"📊 Total words: {totals['words']:,}")
+    written = sum(1 for result in report['results'].values() if 'output' in result)
+    if written:
+        print(f"✅ Wrote {written} modified file(s), {totals['lines_written']:,} lines in total")
+    
+    if report['errors']:
+        reasons = {}
+        for error in report['errors'].values():
+            reasons[error] = reasons.get(error, 0) + 1
+        print(f"\n❌ {len(report['errors'])} file(s) failed:")
+        for reason, count in sorted(reasons.items(), key=lambda item: -item[1]):
+            print(f"  {reason}: {count}")
+        for filename, error in sorted(report['errors'].items()):
+            print(f"⚠️  {filename}: {error}")
+
+def batch_main(argv=None):
+    """
+    Command-line entry point for batch analysis
+    Returns the exit status: 0 if every file succeeded, 1 otherwise
+    """
+    parser = argparse.ArgumentParser(description="Compute statistics and/or modified copies of many files")
+    parser.add_argument('paths', nargs='+', help="files, directories or glob patterns (quote globs)")
+    parser.add_argument('--modify', metavar='OUTPUT_DIR',
+                        help="write the modified version of every file under this directory")
+    parser.add_argument('--no-stats', action='store_true', help="skip statistics (needs --modify)")
+    parser.add_argument('--workers', type=int, help="worker processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+    if args.no_stats and not args.modify:
+        parser.error("--no-stats needs --modify, otherwise there is nothing to do")
+    
+    report = analyze_files(args.paths, stats=not args.no_stats, output_dir=args.modify, workers=args.workers)
+    print_analysis_report(report)
+    return 1 if report['errors'] else 0
+
 # Error Handling Lab 🧪
 def safe_file_operations():
     """Handle file operations with comprehensive error handling"""
@@ -60,26 +1159,27 @@ def safe_file_operations():
             break
         
         try:
-            # Try to open and read the file
-            with open(filename, 'r', encoding='utf-8') as file:
-                content = file.read()
+            # One pass over the file gives all the statistics (and checks it decodes)
+            stats = get_file_stats(filename)
+            
+            # Only the lines shown are read, however big the file is
+            lines, more = head_lines(filename, 5)
             
             # If successful, display file info
             print(f"\n✅ Successfully opened '{filename}'")
-            print(f"📊 File size: {len(content)} characters")
-            print(f"📝 Number of lines: {len(content.splitlines())}")
+            print(f"📊 File size: {stats['characters']} characters")
+            print(f"📝 Number of lines: {stats['lines']}")
             
             # Display first few lines as preview
-            lines = content.splitlines()
             print("\n📖 First 5 lines of the file:")
             print("-" * 40)
-            for i, line in enumerate(lines[:5], 1):
+            for i, line in enumerate(lines, 1):
                 print(f"{i}: {line}")
-            if len(lines) > 5:
+            if more:
                 print("... (file continues)")
-                
+            
             # Ask if user wants to see more options
-            show_more_options(filename, content)
+            show_more_options(filename)
             
         except FileNotFoundError:
             print(f"❌ Error: The file '{filename}' was not found.")
@@ -88,6 +1188,10 @@ def safe_file_operations():
         except PermissionError:
             print(f"❌ Error: Permission denied to read '{filename}'.")
             print("💡 Check if the file is open in another program or if you have read permissions.")
+        
+        except BinaryFileError:
+            print(f"❌ Error: '{filename}' is a binary file, not text.")
+            print("💡 Please choose a text file.")
             
         except UnicodeDecodeError:
             print(f"❌ Error: Cannot decode '{filename}'. It might be a binary file.")
@@ -100,48 +1204,93 @@ def safe_file_operations():
             print(f"❌ An unexpected error occurred: {e}")
             print("💡 Please try again with a different file.")
 
-def show_more_options(filename, content):
+def show_more_options(filename):
     """Show additional file operations"""
+    index = None  # Built on the first search, then reused for every search on this file
+    
     while True:
         print("\nAdditional options:")
         print("1. Count words in file")
         print("2. Search for text in file")
         print("3. Save statistics to new file")
         print("4. Choose another file")
+        print("5. Search for many patterns in files or folders")
+        print("6. Show the last lines of the file")
+        print("7. Follow the file as it grows")
         
-        choice = input("Enter your choice (1-4): ")
+        choice = input("Enter your choice (1-7): ")
         
         if choice == '1':
-            word_count = len(content.split())
+            word_count = get_file_stats(filename)['words']
             print(f"📊 Total words in file: {word_count}")
             
         elif choice == '2':
             search_term = input("Enter text to search for: ")
-            if search_term in content:
-                occurrences = content.count(search_term)
+            if not search_term:
+                print("❌ Please enter some text to search for.")
+                continue
+            if index is None:
+                print("🗂️  Indexing file for fast searching...")
+                try:
+                    index = FileIndex(filename)
+                except ValueError as e:
+                    print(f"❌ {e}")
+                    continue
+            
+            occurrences, matches = index.search(search_term)
+            if matches:
                 print(f"🔍 Found '{search_term}' {occurrences} time(s) in the file")
+                for line_number, count, _ in matches[:10]:
+                    for number, text in index.context(line_number):
+                        marker = '>' if number == line_number else ' '
+                        print(f"  {marker} {number}: {text[:120]}")
+                    print("  " + "-" * 20)
+                if len(matches) > 10:
+                    print(f"  ... and {len(matches) - 10} more matching line(s)")
             else:
                 print(f"🔍 '{search_term}' not found in the file")
                 
         elif choice == '3':
             try:
+                stats = get_file_stats(filename)
                 stats_filename = f"{filename}_stats.txt"
                 with open(stats_filename, 'w') as stats_file:
                     stats_file.write(f"File Statistics for: {filename}\n")
-                    stats_file.write(f"Total characters: {len(content)}\n")
-                    stats_file.write(f"Total lines: {len(content.splitlines())}\n")
-                    stats_file.write(f"Total words: {len(content.split())}\n")
+                    stats_file.write(f"Total bytes: {stats['bytes']}\n")
+                    stats_file.write(f"Total characters: {stats['characters']}\n")
+                    stats_file.write(f"Total lines: {stats['lines']}\n")
+                    stats_file.write(f"Total words: {stats['words']}\n")
                 print(f"✅ Statistics saved to {stats_filename}")
             except Exception as e:
                 print(f"❌ Error saving statistics: {e}")
                 
         elif choice == '4':
             break
+        elif choice == '5':
+            multi_pattern_search(filename)
+        elif choice == '6':
+            count = input("How many lines? (Enter for 10): ").strip()
+            count = int(count) if count.isdigit() else 10
+            last_lines = tail_lines(filename, count)
+            first = get_file_stats(filename)['lines'] - len(last_lines) + 1
+            print(f"\n📖 Last {len(last_lines)} lines of the file:")
+            print("-" * 40)
+            for i, line in enumerate(last_lines, first):
+                print(f"{i}: {line}")
+        elif choice == '7':
+            print(f"👀 Following '{filename}' - press Ctrl+C to stop")
+            try:
+                for line in follow_file(filename):
+                    print(line)
+            except KeyboardInterrupt:
+                print("\n⏹️  Stopped following")
         else:
-            print("❌ Invalid choice. Please enter 1-4.")
+            print("❌ Invalid choice. Please enter 1-7.")
 
-# Run the error handling lab
+# Run the error handling lab (or a batch analysis when given paths on the command line)
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(batch_main())
     file_read_write()
     print("🔍 File Reader with Error Handling")
     print("=" * 40)
@@ -0,0 +1,320 @@
+# Offline benchmark for the file-handling routines
+# Generates a synthetic text corpus and times the whole-file versions of the
+# transform, statistics, search and preview against the streaming, parallel,
+# cached and indexed ones, with peak memory for each
+#
+# Example: python file-handling-benchmark.py --size 256 --line-length 80 --distribution lognormal --profile prof/
+
+import argparse
+import cProfile
+import importlib.util
+import json
+import math
+import os
+import pstats
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import namedtuple
+
+try:
+    import resource  # Unix only - used for the process-wide peak RSS
+except ImportError:
+    resource = None
+
+# Slowdowns smaller than this are timer noise, whatever the percentage
+MIN_REGRESSION_SECONDS = 0.005
+
+# One benchmarked routine: setup (if any) runs once, untimed, before it;
+# in_workers marks routines whose work happens in child processes
+Routine = namedtuple('Routine', 'group name action setup in_workers', defaults=(None, False))
+
+def load_file_handling():
+    """
+    Imports "file and exception Handling.py" (its file name is not a valid module name)
+    The module is registered in sys.modules so its process pools can pickle its functions
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'file and exception Handling.py')
+    spec = importlib.util.spec_from_file_location('file_handling', path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+def make_vocabulary(count, seed=0):
+    """
+    Returns `count` distinct pseudo-words, a few of them non-ASCII
+    """
+    rng = random.Random(seed)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    words = set()
+    while len(words) < count:
+        word = ''.join(rng.choice(letters) for _ in range(rng.randint(2, 10)))
+        if rng.random() < 0.02:
+            word += rng.choice('éüñ€日')
+        words.add(word)
+    return sorted(words)
+
+def line_lengths(distribution, mean, rng):
+    """
+    Endless line lengths (in characters) around `mean`
+    'fixed' is always mean, 'uniform' is 0 to 2*mean, 'lognormal' is
+    mostly short lines with a long tail like real logs
+    """
+    sigma = 1.0
+    mu = math.log(max(mean, 1)) - sigma ** 2 / 2   # Keeps the lognormal mean at `mean`
+    while True:
+        if distribution == 'fixed':
+            yield mean
+        elif distribution == 'uniform':
+            yield rng.randint(0, 2 * mean)
+        else:
+            yield int(rng.lognormvariate(mu, sigma))
+
+def make_corpus(path, size, line_length=80, distribution='lognormal', vocabulary=None, seed=0):
+    """
+    Writes about `size` bytes of UTF-8 text made of vocabulary words to path
+    Returns the number of lines written
+    """
+    rng = random.Random(seed)
+    vocabulary = vocabulary or make_vocabulary(5000, seed)
+    written = 0
+    lines = 0
+    with open(path, 'w', encoding='utf-8', newline='\n') as file:
+        for length in line_lengths(distribution, line_length, rng):
+            words = []
+            used = 0
+            while used < length:
+                word = rng.choice(vocabulary)
+                words.append(word)
+                used += len(word) + 1
+            line = ' '.join(words) + '\n'
+            file.write(line)
+            written += len(line.encode('utf-8'))
+            lines += 1
+            if written >= size:
+                return lines
+
+def peak_rss_mb(who='self'):
+    """
+    Peak resident memory in MB of this process ('self') or of the largest of
+    its finished child processes ('children'), or None where unavailable
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if who == 'children' else resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / 1048576 if sys.platform == 'darwin' else peak / 1024
+
+def build_routines(fh, corpus, workdir, terms, workers):
+    """
+    Returns a list of Routine - every group holds the whole-file version of
+    one job first, then the faster modes of the same job
+    The stats cache and the search index are only built by the setup of the
+    routines that use them, so jobs left out with --only cost nothing
+    """
+    output = os.path.join(workdir, 'modified.txt')
+
+    def read_all():
+        with open(corpus, 'r', encoding='utf-8') as file:
+            return file.read()
+
+    def whole_file_modify():
+        content = read_all()
+        with open(output, 'w', encoding='utf-8') as file:
+            file.write(fh.modify_file_content(content))
+
+    def stream_modify():
+        with open(corpus, 'r', encoding='utf-8') as input_file, \
+                open(output, 'w', encoding='utf-8', buffering=fh.OUTPUT_BUFFER_SIZE) as output_file:
+            fh.stream_modify_file(input_file, output_file)
+
+    def parallel_modify():
+        with open(output, 'w', encoding='utf-8', buffering=fh.OUTPUT_BUFFER_SIZE) as output_file:
+            fh.parallel_modify_file(corpus, output_file, workers=workers)
+
+    def whole_file_stats():
+        content = read_all()
+        return len(content), len(content.splitlines()), len(content.split())
+
+    built = {}
+    
+    def warm_cache():
+        built['cache'] = fh.StatsCache(os.path.join(workdir, 'stats-cache.sqlite3'))
+        built['cache'].get_stats(corpus)   # Warm it, so the cached row measures a hit
+
+    def whole_file_search():
+        lines = read_all().splitlines()
+        return [sum(line.count(term) for line in lines) for term in terms]
+
+    def build_index():
+        built['index'] = fh.FileIndex(corpus)
+
+    def whole_file_preview():
+        return read_all().splitlines()[:5]
+
+    return [
+        Routine('modify', "whole file", whole_file_modify),
+        Routine('modify', "streaming", stream_modify),
+        Routine('modify', f"parallel ({workers or os.cpu_count()} workers)", parallel_modify, in_workers=True),
+        Routine('stats', "whole file", whole_file_stats),
+        Routine('stats', "mmap scan", lambda: fh.compute_file_stats(corpus)),
+        Routine('stats', "cache hit", lambda: built['cache'].get_stats(corpus), setup=warm_cache),
+        Routine('search', f"whole file ({len(terms)} terms)", whole_file_search),
+        Routine('search', "index build", lambda: fh.FileIndex(corpus)),
+        Routine('search', f"index lookups ({len(terms)} terms)",
+                lambda: [built['index'].search(term) for term in terms], setup=build_index),
+        Routine('search', f"multi-pattern ({len(terms)} terms)",
+                lambda: fh.search_files(terms, corpus, workers=workers), in_workers=True),
+        Routine('preview', "whole file", whole_file_preview),
+        Routine('preview', "head + tail", lambda: (fh.head_lines(corpus, 5), fh.tail_lines(corpus, 5))),
+    ]
+
+def run_routine(routine, repeat, profile_dir=None):
+    """
+    Runs the routine's setup, times its action `repeat` times, then runs it
+    once more under tracemalloc (and cProfile if profile_dir is set) for the
+    memory figures
+    tracemalloc only sees this process, so for in_workers routines the
+    peak covers the coordinating work, not the workers
+    """
+    group, name, action, setup, in_workers = routine
+    if setup is not None:
+        setup()
+    
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        action()
+        times.append(time.perf_counter() - started)
+
+    slug = f"{group}-{name}".replace(' ', '_').replace('(', '').replace(')', '')
+    profiler = cProfile.Profile() if profile_dir else None
+    tracemalloc.start()
+    if profiler:
+        profiler.enable()
+    action()
+    if profiler:
+        profiler.disable()
+    _, peak_traced = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot() if profile_dir else None
+    tracemalloc.stop()
+
+    if profile_dir:
+        profiler.dump_stats(os.path.join(profile_dir, f"{slug}.prof"))
+        with open(os.path.join(profile_dir, f"{slug}.txt"), 'w') as report:
+            pstats.Stats(profiler, stream=report).sort_stats('cumulative').print_stats(30)
+        with open(os.path.join(profile_dir, f"{slug}-tracemalloc.txt"), 'w') as report:
+            for stat in snapshot.statistics('lineno')[:25]:
+                report.write(f"{stat}\n")
+
+    return {
+        'group': group,
+        'name': name,
+        'best_s': min(times),
+        'median_s': statistics.median(times),
+        'peak_traced_mb': peak_traced / 1048576,
+        'in_workers': in_workers,
+    }
+
+def print_results(results, corpus_mb, baseline=None, tolerance=0.1):
+    """
+    Prints one row per routine with its speedup over the whole-file version
+    of the same job, and its change against a saved baseline if given
+    """
+    previous = {(r['group'], r['name']): r for r in baseline or []}
+    print(f"\n{'Job':<9}{'Mode':<30}{'Best s':>9}{'Median s':>10}{'MB/s':>9}{'Speedup':>9}{'Peak MB':>9}"
+          + (f"{'vs base':>10}" if baseline else ""))
+    print("-" * (85 + (10 if baseline else 0)))
+    regressions = []
+    reference = {}
+    for r in results:
+        reference.setdefault(r['group'], r['best_s'])
+        speedup = reference[r['group']] / r['best_s'] if r['best_s'] else 0.0
+        row = (f"{r['group']:<9}{r['name']:<30}{r['best_s']:>9.3f}{r['median_s']:>10.3f}"
+               f"{corpus_mb / r['best_s'] if r['best_s'] else 0.0:>9.1f}{speedup:>8.1f}x"
+               f"{r['peak_traced_mb']:>8.1f}{'*' if r.get('in_workers') else ' '}")
+        old = previous.get((r['group'], r['name']))
+        if old:
+            change = r['best_s'] / old['best_s'] - 1 if old['best_s'] else 0.0
+            row += f"{change:>+9.0%}"
+            if change > tolerance and r['best_s'] - old['best_s'] > MIN_REGRESSION_SECONDS:
+                regressions.append(f"{r['group']} / {r['name']}")
+                row += " ⚠️"
+        print(row)
+
+    if any(r.get('in_workers') for r in results):
+        print("\n* Peak MB of this process only - the work itself runs in worker processes")
+    rss = peak_rss_mb()
+    if rss is not None:
+        print(f"\nProcess peak RSS over the whole run: {rss:,.1f} MB")
+        children = peak_rss_mb('children')
+        if children:
+            print(f"Largest worker process peak RSS: {children:,.1f} MB")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the file-handling routines on a synthetic corpus")
+    parser.add_argument('--size', type=float, default=64, help="corpus size in MB")
+    parser.add_argument('--line-length', type=int, default=80, help="mean line length in characters")
+    parser.add_argument('--distribution', choices=['fixed', 'uniform', 'lognormal'], default='lognormal',
+                        help="how line lengths vary around the mean")
+    parser.add_argument('--terms', type=int, default=20, help="search terms per search")
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per routine")
+    parser.add_argument('--workers', type=int, help="worker processes for the parallel modes")
+    parser.add_argument('--only', nargs='+', choices=['modify', 'stats', 'search', 'preview'],
+                        help="run only these jobs")
+    parser.add_argument('--corpus', help="use this file instead of generating one")
+    parser.add_argument('--profile', metavar='DIR', help="write cProfile and tracemalloc reports here")
+    parser.add_argument('--save', metavar='JSON', help="save the results for later --compare runs")
+    parser.add_argument('--compare', metavar='JSON', help="flag routines slower than these saved results")
+    parser.add_argument('--tolerance', type=float, default=0.1, help="slowdown that counts as a regression")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    fh = load_file_handling()
+    workdir = tempfile.mkdtemp(prefix='file-bench-')
+    try:
+        vocabulary = make_vocabulary(5000, args.seed)
+        corpus = args.corpus
+        if corpus is None:
+            corpus = os.path.join(workdir, 'corpus.txt')
+            print(f"🧪 Generating a {args.size:g} MB corpus ({args.distribution} lines, mean {args.line_length} chars)...")
+            lines = make_corpus(corpus, int(args.size * 1048576), args.line_length, args.distribution,
+                                vocabulary, args.seed)
+            print(f"   {lines:,} lines")
+        corpus_mb = os.path.getsize(corpus) / 1048576
+        terms = random.Random(args.seed).sample(vocabulary, args.terms)
+        if args.profile:
+            os.makedirs(args.profile, exist_ok=True)
+
+        results = []
+        for routine in build_routines(fh, corpus, workdir, terms, args.workers):
+            if args.only and routine.group not in args.only:
+                continue
+            print(f"▶️  {routine.group}: {routine.name}...")
+            results.append(run_routine(routine, args.repeat, args.profile))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)['results']
+    regressions = print_results(results, corpus_mb, baseline, args.tolerance)
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump({'args': vars(args), 'corpus_mb': corpus_mb, 'results': results}, file, indent=2)
+        print(f"💾 Results saved to {args.save}")
+    if args.profile:
+        print(f"📈 Profiles written to {args.profile}")
+    if regressions:
+        print(f"\n⚠️  Slower than the baseline by more than {args.tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,90 @@
 import requests
+import hashlib
+import heapq
+import json
 import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import Counter, deque
+from itertools import chain, count
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
 from urllib.parse import urlparse
 from pathlib import Path
 
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# Bytes read from the network per write; memory use per download stays at this size
+DEFAULT_CHUNK_SIZE = 8192
+
+# Seconds to wait for the server to connect or send more data
+DEFAULT_TIMEOUT = 30
+
+# Errors after which a transfer can be picked up again from the last byte received
+RESUMABLE_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+# HTTP statuses worth retrying; 429 and 503 also pause the whole host
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+HOST_THROTTLE_STATUSES = {429, 503}
+
+# How much of the body is inspected for an image signature before saving anything
+SNIFF_BYTES = 512
+
+# Images at least this big are split into parallel byte ranges when range_parts > 1
+DEFAULT_RANGE_THRESHOLD = 8 * 1024 * 1024
+
+# Shared keep-alive session used by every downloader (see get_session)
+_session = None
+_session_lock = threading.Lock()
+
+def configure_session(pool_connections=10, pool_maxsize=10, host_pool_sizes=None):
+    """
+    Builds the shared HTTP session with connection pooling and keep-alive
+    pool_connections is how many hosts keep a cached pool, pool_maxsize is
+    how many open connections each host may keep. host_pool_sizes maps a
+    host (e.g. 'cdn.example.com') to its own pool size for busy servers.
+    Returns the new session; any previous one is closed.
+    """
+    global _session
+    
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    
+    # requests picks the longest matching prefix, so these override the defaults
+    for host, size in (host_pool_sizes or {}).items():
+        host_adapter = HTTPAdapter(pool_connections=1, pool_maxsize=size)
+        session.mount(f'http://{host}', host_adapter)
+        session.mount(f'https://{host}', host_adapter)
+    
+    with _session_lock:
+        old_session, _session = _session, session
+    if old_session is not None:
+        old_session.close()
+    
+    return session
+
+def get_session():
+    """
+    Returns the shared HTTP session, creating it with default pool sizes if needed
+    """
+    with _session_lock:
+        session = _session
+    return session if session is not None else configure_session()
+
 def download_image_from_url():
     """
     Downloads an image from a URL and saves it to Fetched_Images directory
@@ -23,22 +105,19 @@ def download_image_from_url():
         os.makedirs(image_dir, exist_ok=True)
         print(f"📁 Directory '{image_dir}' is ready!")
         
-        # Send GET request with headers to mimic a browser
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
+        # The shared session sends browser-like headers and reuses connections
+        # If an earlier attempt left a .part file, only the missing bytes are requested
         print("🌐 Connecting to the server...")
-        response = requests.get(url, headers=headers, timeout=30, stream=True)
-        
-        # Check if request was successful
-        response.raise_for_status()
+        session = get_session()
+        part_path = _part_path(image_dir, url)
+        response, offset = _request_part(session, url, part_path, DEFAULT_TIMEOUT)
         
-        # Check if content is actually an image
-        content_type = response.headers.get('content-type', '')
-        if not content_type.startswith('image/'):
+        # Check if content is actually an image by looking at its first bytes
+        try:
+            content_type, chunks = _sniff_response(response, DEFAULT_CHUNK_SIZE, part_path, offset)
+        except ValueError:
             print("❌ Error: The URL does not point to an image file!")
-            print(f"   Content-Type received: {content_type}")
+            print(f"   Content-Type received: {response.headers.get('content-type', '')}")
             return
         
         # Extract filename from URL or generate one
@@ -49,15 +128,18 @@ def download_image_from_url():
         if os.path.exists(filepath):
             overwrite = input(f"⚠️  File '{filename}' already exists. Overwrite? (y/n): ").lower()
             if overwrite != 'y':
+                response.close()
                 print("📝 Operation cancelled by user.")
                 return
         
-        # Download and save the image
+        # Download and save the image, resuming automatically if the connection drops
+        if offset:
+            print(f"🔁 Resuming previous download from byte {offset:,}...")
         print(f"💾 Downloading image as '{filename}'...")
-        with open(filepath, 'wb') as file:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    file.write(chunk)
+        _stream_resumable(session, url, part_path, response, chunks, offset,
+                          DEFAULT_CHUNK_SIZE, DEFAULT_TIMEOUT, max_attempts=3)
+        os.replace(part_path, filepath)
+        _discard_validator(part_path)
         
         # Verify the file was saved
         file_size = os.path.getsize(filepath)
@@ -74,7 +156,7 @@ def download_image_from_url():
         
     except requests.exceptions.Timeout:
         print("❌ Timeout Error: The request took too long.")
-        print("💡 The server might be busy. Try again later.")
+        print("💡 The server might be busy. Try again later - the download will resume where it stopped.")
         
     except requests.exceptions.RequestException as e:
         print(f"❌ Request Error: {e}")
@@ -89,6 +171,7 @@ def download_image_from_url():
 def extract_filename(url, content_type):
     """
     Extracts filename from URL or generates one based on content type
+    A URL extension that does not fit the content type is replaced
     """
     # Parse the URL
     parsed_url = urlparse(url)
@@ -98,11 +181,13 @@ def extract_filename(url, content_type):
     if path and '/' in path:
         filename = path.split('/')[-1]
         if filename and '.' in filename:
+            name, ext = os.path.splitext(filename)
+            if content_type in IMAGE_EXTENSIONS and ext.lower() not in IMAGE_EXTENSIONS[content_type]:
+                return name + get_extension_from_content_type(content_type)
             return filename
     
     # Generate filename based on content type
     extension = get_extension_from_content_type(content_type)
-    import time
     timestamp = int(time.time())
     return f"image_{timestamp}{extension}"
 
@@ -118,14 +203,94 @@ def get_extension_from_content_type(content_type):
         'image/webp': '.webp',
         'image/svg+xml': '.svg',
         'image/bmp': '.bmp',
-        'image/tiff': '.tiff'
+        'image/tiff': '.tiff',
+        'image/x-icon': '.ico',
+        'image/vnd.microsoft.icon': '.ico',
+        'image/avif': '.avif',
+        'image/heic': '.heic',
+        'image/heif': '.heif',
+        'image/jxl': '.jxl'
     }
     
     return extension_map.get(content_type.lower(), '.jpg')  # Default to .jpg
 
+# Extensions that are acceptable for each type sniff_image_type can detect
+IMAGE_EXTENSIONS = {
+    'image/jpeg': ('.jpg', '.jpeg', '.jpe', '.jfif'),
+    'image/png': ('.png',),
+    'image/gif': ('.gif',),
+    'image/webp': ('.webp',),
+    'image/bmp': ('.bmp', '.dib'),
+    'image/tiff': ('.tif', '.tiff'),
+    'image/svg+xml': ('.svg',),
+    'image/x-icon': ('.ico', '.cur'),
+    'image/avif': ('.avif',),
+    'image/heic': ('.heic', '.heif'),
+    'image/jxl': ('.jxl',),
+}
+
+# Sizes of the BMP DIB headers (core, info, v2-v5) that follow the 14-byte file header
+_BMP_HEADER_SIZES = {12, 16, 40, 52, 56, 64, 108, 124}
+
+# ISO media 'ftyp' brands of AVIF and HEIC/HEIF images
+_FTYP_BRANDS = {
+    b'avif': 'image/avif', b'avis': 'image/avif',
+    b'heic': 'image/heic', b'heix': 'image/heic', b'heim': 'image/heic', b'heis': 'image/heic',
+    b'mif1': 'image/heic', b'msf1': 'image/heic',
+}
+
+# Bytes that show up in binary data but not in text (tabs, line breaks, form feeds and escapes do)
+_BINARY_BYTES = bytes(b for b in range(32) if b not in b'\t\n\r\x0c\x1b') + b'\x7f'
+_TEXT_BYTES = bytes(b for b in range(256) if b not in _BINARY_BYTES)
+
+def sniff_image_type(data, declared_type=None):
+    """
+    Identifies an image from its first bytes using file signatures
+    Returns the MIME type (JPEG, PNG, GIF, WebP, BMP, TIFF, SVG, ICO, AVIF,
+    HEIC or JPEG XL) or None. Formats without a known signature are trusted
+    to be what declared_type (the Content-Type) says, as long as it is an
+    image/* type and the data does not look like text such as an HTML page
+    """
+    if data.startswith(b'\xff\xd8\xff'):
+        return 'image/jpeg'
+    if data.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'image/png'
+    if data[:6] in (b'GIF87a', b'GIF89a'):
+        return 'image/gif'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'image/webp'
+    if data.startswith(b'BM') and len(data) >= 18 and int.from_bytes(data[14:18], 'little') in _BMP_HEADER_SIZES:
+        return 'image/bmp'
+    if data[:4] in (b'II*\x00', b'MM\x00*'):
+        return 'image/tiff'
+    if data[:4] in (b'\x00\x00\x01\x00', b'\x00\x00\x02\x00') and len(data) >= 6 and data[4:6] != b'\x00\x00':
+        return 'image/x-icon'
+    if data[4:8] == b'ftyp' and data[8:12] in _FTYP_BRANDS:
+        return _FTYP_BRANDS[data[8:12]]
+    if data.startswith((b'\xff\x0a', b'\x00\x00\x00\x0cJXL \r\n\x87\n')):
+        return 'image/jxl'
+    
+    # SVG is XML text: allow a BOM, whitespace, an XML declaration, comments or a doctype first
+    text = data.lstrip(b'\xef\xbb\xbf').lstrip().lower()
+    if text.startswith((b'<svg', b'<?xml', b'<!--', b'<!doctype svg')) and b'<svg' in text:
+        return 'image/svg+xml'
+    
+    declared_type = (declared_type or '').split(';')[0].strip().lower()
+    if declared_type.startswith('image/') and data and not _looks_like_text(data):
+        return declared_type
+    return None
+
+def _looks_like_text(data):
+    """
+    True if data has none of the control bytes binary formats are full of
+    (HTML error pages, JSON and plain text do not)
+    """
+    return not data.translate(None, _TEXT_BYTES)
+
+
 def batch_download_mode():
     """
-    Optional: Allows downloading multiple images
+    Allows downloading multiple images in parallel
     """
     print("\n🎯 BATCH DOWNLOAD MODE")
     print("Enter multiple URLs (one per line). Type 'done' when finished.")
@@ -138,17 +303,186 @@ def batch_download_mode():
         if url:
             urls.append(url)
     
-    print(f"\n📥 Preparing to download {len(urls)} images...")
+    if not urls:
+        print("❌ Error: No URLs provided!")
+        return
+    
+    workers = input("Number of parallel downloads (default 8): ").strip()
+    max_workers = int(workers) if workers.isdigit() and int(workers) > 0 else 8
+    
+    rate = input("Max requests per second per host (default: no limit): ").strip()
+    try:
+        rate = float(rate) if rate and float(rate) > 0 else None
+    except ValueError:
+        rate = None
+    
+    limit = f", at most {rate:g} requests/s per host" if rate else ""
+    print(f"\n📥 Preparing to download {len(urls)} images with {max_workers} workers{limit}...")
+    
+    # Live aggregate progress, redrawn on one line after every finished download
+    # (download_batch fetches each distinct URL once)
+    progress = DownloadStats(total=len(set(urls)))
+    
+    def show_progress(metrics):
+        progress.add(metrics)
+        print(f"\r📶 {progress.progress_line()}", end='', flush=True)
+    
+    report = download_batch(urls, max_workers=max_workers, rate_limiter=HostRateLimiter(rate),
+                            on_metrics=show_progress)
+    print()
+    print_batch_report(report)
+
+def download_batch(urls, download_dir="Fetched_Images", max_workers=8, per_host_limit=4,
+                   session=None, rate_limiter=None, retries=3, backoff=1.0, max_backoff=60.0,
+                   on_metrics=None, run_log=None, **download_options):
+    """
+    Downloads a list of image URLs in parallel using a thread pool
+    No more than per_host_limit downloads run against the same host at once,
+    so a long list from one server cannot starve the others
+    Keep per_host_limit at or below the session's pool size per host,
+    otherwise extra connections are opened and thrown away
+    rate_limiter (a HostRateLimiter, created with its defaults if not given)
+    can hold each host to a request rate; by default there is no limit up
+    front and a host is only paused when it throttles us. Failures with
+    a retryable status or a network error are retried up to `retries` times
+    with jittered exponential backoff, honouring Retry-After; while one URL
+    waits, workers move on to other hosts instead of sleeping
+    Every finished download produces a metrics dict (see _download_image)
+    that is passed to on_metrics and, if run_log is a path, appended to that
+    JSON-lines file
+    Extra keyword arguments (e.g. chunk_size) are passed to every download
+    A URL listed more than once is downloaded once (concurrent copies would
+    share its .part file when resuming) and reported under 'duplicates'
+    Returns a report dict with the successful and failed downloads and the
+    aggregate statistics under 'stats'
+    """
+    if session is None:
+        session = get_session()
+    if rate_limiter is None:
+        rate_limiter = HostRateLimiter()
+    
+    listed = Counter(urls)
+    urls = list(listed)
+    duplicates = [url for url, times in listed.items() if times > 1]
+    
+    report = {
+        'total': len(urls),
+        'succeeded': [],
+        'failed': [],
+        'duplicates': duplicates,
+        'elapsed': 0.0,
+    }
+    stats = DownloadStats(total=len(urls))
+    log = MetricsLog(run_log) if run_log else None
+    
+    def record(metrics):
+        stats.add(metrics)
+        if log is not None:
+            log(metrics)
+        if on_metrics is not None:
+            on_metrics(metrics)
+    
+    # Queue (url, attempt) pairs per host so we can enforce the per-host cap
+    pending = {}
+    for url in urls:
+        host = urlparse(url).netloc.lower()
+        pending.setdefault(host, deque()).append((url, 1))
+    
+    active_per_host = {host: 0 for host in pending}
+    sequence = count()
+    delayed = []  # heap of (ready time, sequence, host, url, attempt) waiting to be retried
+    running = {}
+    start = time.perf_counter()
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        
+        def fill_slots():
+            """Submits whatever may run now; returns seconds until more could"""
+            now = time.monotonic()
+            while delayed and delayed[0][0] <= now:
+                _, _, host, url, attempt = heapq.heappop(delayed)
+                pending[host].append((url, attempt))
+            next_wakeup = delayed[0][0] - now if delayed else None
+            
+            # Round-robin over hosts so every host gets a fair share of workers
+            submitted = True
+            while submitted and len(running) < max_workers:
+                submitted = False
+                for host, queue in pending.items():
+                    if len(running) >= max_workers:
+                        break
+                    if not queue or active_per_host[host] >= per_host_limit:
+                        continue
+                    wait_time = rate_limiter.try_acquire(host)
+                    if wait_time:
+                        next_wakeup = wait_time if next_wakeup is None else min(next_wakeup, wait_time)
+                        continue
+                    url, attempt = queue.popleft()
+                    future = executor.submit(_measured_download, url, download_dir, session,
+                                             download_options)
+                    running[future] = (host, url, attempt)
+                    active_per_host[host] += 1
+                    submitted = True
+            return next_wakeup
+        
+        next_wakeup = fill_slots()
+        while running or next_wakeup is not None:
+            if not running:
+                time.sleep(next_wakeup)
+                next_wakeup = fill_slots()
+                continue
+            
+            done, _ = wait(running, timeout=next_wakeup, return_when=FIRST_COMPLETED)
+            for future in done:
+                host, url, attempt = running.pop(future)
+                active_per_host[host] -= 1
+                filepath, metrics, error = future.result()
+                metrics['retries'] = attempt - 1
+                if error is None:
+                    report['succeeded'].append({'url': url, 'path': filepath})
+                    record(metrics)
+                    continue
+                
+                delay = _retry_delay(error, attempt, backoff, max_backoff) if attempt <= retries else None
+                if delay is None:
+                    report['failed'].append({'url': url, 'error': str(error)})
+                    record(metrics)
+                    continue
+                if _throttled(error):
+                    rate_limiter.pause(host, delay)
+                heapq.heappush(delayed, (time.monotonic() + delay, next(sequence), host, url, attempt + 1))
+            next_wakeup = fill_slots()
+    
+    if log is not None:
+        log.close()
+    report['elapsed'] = time.perf_counter() - start
+    report['stats'] = stats.summary()
+    return report
+
+def print_batch_report(report):
+    """
+    Prints a summary of a batch download run
+    """
+    print(f"\n🎉 Download complete! {len(report['succeeded'])}/{report['total']} images downloaded successfully.")
+    print(f"⏱️  Elapsed time: {report['elapsed']:.2f} seconds")
+    if report.get('duplicates'):
+        print(f"🔁 {len(report['duplicates'])} URL(s) listed more than once were downloaded once")
     
-    success_count = 0
-    for i, url in enumerate(urls, 1):
-        print(f"\n--- Downloading image {i}/{len(urls)} ---")
-        # This would call a modified version of download_image_from_url
-        # that accepts URL as parameter instead of user input
-        print(f"URL: {url}")
-        # download_single_image(url)  # You could implement this function
+    stats = report.get('stats')
+    if stats:
+        print(f"📊 Transferred {stats['bytes']:,} bytes at {stats['bytes_per_sec'] / 1024:,.1f} KB/s, "
+              f"mean time to first byte {stats['mean_ttfb'] * 1000:.0f} ms")
+        print(f"♻️  Cache hits: {stats['cache_hits']}, bytes saved: {stats['bytes_saved']:,}, "
+              f"retries: {stats['retries']}")
+        slowest = sorted(stats['hosts'].items(), key=lambda item: item[1]['bytes_per_sec'])[:3]
+        if len(stats['hosts']) > 1:
+            print("🐢 Slowest hosts: " + ", ".join(
+                f"{host} ({host_stats['bytes_per_sec'] / 1024:,.1f} KB/s)" for host, host_stats in slowest))
     
-    print(f"\n🎉 Download complete! {success_count}/{len(urls)} images downloaded successfully.")
+    if report['failed']:
+        print(f"\n❌ {len(report['failed'])} download(s) failed:")
+        for failure in report['failed']:
+            print(f"   • {failure['url']}: {failure['error']}")
 
 def main():
     """
@@ -175,44 +509,877 @@ def main():
             print("❌ Invalid choice! Please enter 1, 2, or 3.")
 
 # Alternative function for programmatic use
-def download_single_image(url, download_dir="Fetched_Images"):
+def download_single_image(url, download_dir="Fetched_Images", session=None, rate_limiter=None,
+                          retries=3, backoff=1.0, max_backoff=60.0, on_metrics=None,
+                          **download_options):
     """
     Function to download a single image without user interaction
     Useful for embedding in other scripts
+    Retryable failures (429/5xx, network errors) are retried up to `retries`
+    times with jittered exponential backoff, honouring Retry-After. Pass a
+    shared HostRateLimiter when calling this from several threads
+    on_metrics, if given, is called with the download's metrics dict
+    (see _download_image), e.g. a MetricsLog to keep a JSON-lines run log
+    Keyword options (chunk_size, timeout, resume, ...) are described in _download_image
     """
-    try:
-        os.makedirs(download_dir, exist_ok=True)
+    host = urlparse(url).netloc.lower()
+    attempt = 1
+    while True:
+        if rate_limiter is not None:
+            rate_limiter.acquire(host)
+        filepath, metrics, error = _measured_download(url, download_dir, session, download_options)
+        metrics['retries'] = attempt - 1
         
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
+        delay = None
+        if error is not None and attempt <= retries:
+            delay = _retry_delay(error, attempt, backoff, max_backoff)
+        if delay is None:
+            if on_metrics is not None:
+                on_metrics(metrics)
+            if error is not None:
+                print(f"Error downloading {url}: {error}")
+            return filepath
         
-        response = requests.get(url, headers=headers, timeout=30)
+        if rate_limiter is not None and _throttled(error):
+            rate_limiter.pause(host, delay)
+        time.sleep(delay)
+        attempt += 1
+
+def _measured_download(url, download_dir, session, download_options):
+    """
+    Runs one download attempt without raising
+    Returns (path or None, metrics dict, exception or None)
+    """
+    metrics = {'url': url, 'host': urlparse(url).netloc.lower(), 'path': None, 'error': None}
+    started = time.perf_counter()
+    try:
+        metrics['path'] = _download_image(url, download_dir, session, metrics=metrics,
+                                          **download_options)
+        return metrics['path'], metrics, None
+    except Exception as e:
+        metrics['error'] = str(e)
+        metrics.setdefault('total_time', time.perf_counter() - started)
+        return None, metrics, e
+
+def _retry_delay(error, attempt, backoff, max_backoff):
+    """
+    Returns how many seconds to wait before retrying after error, or None
+    if it should not be retried. A Retry-After header is honoured as long as
+    it is within max_backoff; otherwise the wait is full-jitter exponential
+    backoff: a random time up to backoff * 2 ** (attempt - 1), capped at max_backoff
+    """
+    if isinstance(error, requests.exceptions.HTTPError):
+        response = error.response
+        if response is None or response.status_code not in RETRYABLE_STATUSES:
+            return None
+        retry_after = _parse_retry_after(response.headers.get('Retry-After'))
+        if retry_after is not None:
+            return retry_after if retry_after <= max_backoff else None
+    elif not isinstance(error, RESUMABLE_ERRORS):
+        return None
+    
+    return random.uniform(0, min(max_backoff, backoff * 2 ** (attempt - 1)))
+
+def _parse_retry_after(value):
+    """
+    Converts a Retry-After header (seconds or an HTTP date) to seconds from now
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def _throttled(error):
+    """
+    True if the server told us to slow down (429 or 503)
+    """
+    response = getattr(error, 'response', None)
+    return response is not None and response.status_code in HOST_THROTTLE_STATUSES
+
+# Serialises picking a free filename and moving the finished file into place
+_filename_lock = threading.Lock()
+
+def _download_image(url, download_dir, session=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                    timeout=DEFAULT_TIMEOUT, resume=False, max_attempts=3,
+                    range_parts=1, range_threshold=DEFAULT_RANGE_THRESHOLD, dedupe=False,
+                    cache=False, metrics=None):
+    """
+    Downloads a single image and returns the saved path
+    The body is streamed in chunk_size pieces into a temp file that is only
+    renamed into place once complete, so failures never leave partial images
+    With resume=True the bytes go to a stable .part file instead; dropped
+    connections are retried with an HTTP Range header up to max_attempts
+    times, and a .part left by a failed call is picked up by the next one
+    With range_parts > 1, images of at least range_threshold bytes on servers
+    that advertise Accept-Ranges are fetched as that many parallel ranges
+    With dedupe=True the image is kept once under its SHA-256 digest in the
+    download_dir's ContentStore and the returned path is that stored copy
+    With cache=True a URL downloaded before is revalidated with
+    If-None-Match / If-Modified-Since (see HttpCache); a 304 reply returns
+    the existing file without transferring the image again
+    If a metrics dict is given it is filled in with ttfb (seconds until the
+    response headers arrived), transfer_time, total_time, bytes actually
+    transferred, bytes_per_sec, cache_hit and bytes_saved (bytes reused from
+    the cache or an earlier .part file instead of being downloaded)
+    Raises on any failure so batch callers can record the reason
+    """
+    started = time.perf_counter()
+    os.makedirs(download_dir, exist_ok=True)
+    
+    if session is None:
+        session = get_session()
+    
+    http_cache = get_http_cache(download_dir) if cache else None
+    entry = http_cache.get(url) if http_cache else None
+    
+    temp_path = None
+    digest = None
+    bytes_saved = 0
+    
+    # Known URLs are revalidated with a single conditional GET below instead
+    if range_parts > 1 and entry is None:
+        ranged = _download_ranges(session, url, download_dir, chunk_size, timeout,
+                                  max_attempts, range_parts, range_threshold)
+        if ranged is not None:
+            temp_path, head = ranged
+            response_headers = head.headers
+            ttfb = head.elapsed.total_seconds()
+            content_type = sniff_image_type(_read_head(temp_path), head.headers.get('content-type'))
+            if content_type is None:
+                os.remove(temp_path)
+                raise ValueError("Downloaded data is not a recognised image format")
+    
+    if temp_path is None and resume and entry is None:
+        part_path = _part_path(download_dir, url)
+        response, offset = _request_part(session, url, part_path, timeout)
+        content_type, chunks = _sniff_response(response, chunk_size, part_path, offset)
+        response_headers = response.headers
+        ttfb = response.elapsed.total_seconds()
+        bytes_saved = offset
+        _stream_resumable(session, url, part_path, response, chunks, offset,
+                          chunk_size, timeout, max_attempts)
+        _discard_validator(part_path)
+        temp_path = part_path
+    
+    if temp_path is None:
+        hasher = hashlib.sha256() if dedupe else None
+        headers = HttpCache.conditional_headers(entry) if entry else None
+        with session.get(url, headers=headers, timeout=timeout, stream=True) as response:
+            ttfb = response.elapsed.total_seconds()
+            if response.status_code == 304:
+                http_cache.touch(url)
+                _record_metrics(metrics, started, ttfb, 0, entry['size'], cache_hit=True)
+                return entry['path']
+            response.raise_for_status()
+            content_type, chunks = _sniff_response(response, chunk_size)
+            response_headers = response.headers
+            
+            fd, temp_path = tempfile.mkstemp(dir=download_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as file:
+                    _write_stream(chunks, file, hasher)
+            except BaseException:
+                os.remove(temp_path)
+                raise
+        if hasher is not None:
+            digest = hasher.hexdigest()
+    
+    _record_metrics(metrics, started, ttfb, os.path.getsize(temp_path) - bytes_saved, bytes_saved)
+    
+    filename = extract_filename(url, content_type)
+    if not dedupe:
+        filepath = None
+        # Content-store objects (from a dedupe run) are shared, so only plain files are replaced
+        if entry and os.path.dirname(os.path.abspath(entry['path'])) == os.path.abspath(download_dir):
+            filepath = _refresh_file(temp_path, entry['path'], filename)
+        if filepath is None:
+            filepath = _publish_file(temp_path, download_dir, filename)
+    else:
+        # Resumed and ranged downloads were written out of order, so hash them now
+        if digest is None:
+            digest = _hash_file(temp_path, chunk_size)
+        filepath = get_content_store(download_dir).add(temp_path, digest, url, filename)
+    
+    if http_cache is not None:
+        http_cache.put(url, response_headers, filepath)
+    return filepath
+
+def _record_metrics(metrics, started, ttfb, transferred, bytes_saved, cache_hit=False):
+    """
+    Fills in a download's metrics dict, if the caller asked for one
+    """
+    if metrics is None:
+        return
+    total_time = time.perf_counter() - started
+    transfer_time = max(total_time - ttfb, 0.0)
+    metrics.update({
+        'ttfb': ttfb,
+        'transfer_time': transfer_time,
+        'total_time': total_time,
+        'bytes': transferred,
+        'bytes_per_sec': transferred / transfer_time if transfer_time else 0.0,
+        'cache_hit': cache_hit,
+        'bytes_saved': bytes_saved,
+    })
+
+def _sniff_response(response, chunk_size, part_path=None, offset=0):
+    """
+    Checks that a streamed response really is an image by its first bytes
+    rather than trusting Content-Type. When resuming (offset > 0) the start
+    of the image is already in part_path, so that is checked instead
+    Returns (sniffed MIME type, iterator over the body chunks); the chunks
+    read for the check are replayed at the front of the iterator
+    Raises ValueError if it is not an image, after reading only the first
+    chunk (chunk_size bytes, or more until there are SNIFF_BYTES)
+    """
+    chunks = response.iter_content(chunk_size=chunk_size)
+    if offset:
+        head = _read_head(part_path)
+        replay = []
+    else:
+        head = b''
+        for chunk in chunks:
+            head += chunk
+            if len(head) >= SNIFF_BYTES:
+                break
+        replay = [head]
+    
+    content_type = sniff_image_type(head, response.headers.get('content-type'))
+    if content_type is None:
+        response.close()
+        raise ValueError(
+            "URL does not point to an image (no image signature found). "
+            f"Content-Type: {response.headers.get('content-type', '')}"
+        )
+    return content_type, chain(replay, chunks)
+
+def _read_head(path):
+    """
+    Returns the first SNIFF_BYTES of a file
+    """
+    with open(path, 'rb') as file:
+        return file.read(SNIFF_BYTES)
+
+def _write_stream(chunks, file, hasher=None):
+    """
+    Copies streamed body chunks into an open file
+    If a hashlib object is given it is updated with every chunk written
+    """
+    for chunk in chunks:
+        if chunk:
+            file.write(chunk)
+            if hasher is not None:
+                hasher.update(chunk)
+
+def _hash_file(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Returns the SHA-256 hex digest of a file, reading it in chunks
+    """
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+def _part_path(download_dir, url):
+    """
+    Returns the stable .part path used to resume downloads of url
+    """
+    digest = hashlib.sha1(url.encode('utf-8')).hexdigest()[:20]
+    return os.path.join(download_dir, f"{digest}.part")
+
+def _range_validator(response):
+    """
+    Returns the ETag or Last-Modified value usable in an If-Range header
+    Weak ETags are not allowed there, so they are ignored
+    """
+    etag = response.headers.get('ETag')
+    if etag and not etag.startswith('W/'):
+        return etag
+    return response.headers.get('Last-Modified')
+
+def _save_validator(part_path, response):
+    """
+    Remembers which version of the image a .part file belongs to
+    """
+    validator = _range_validator(response)
+    if validator:
+        with open(part_path + '.json', 'w', encoding='utf-8') as file:
+            json.dump({'validator': validator}, file)
+    else:
+        _discard_validator(part_path)
+
+def _load_validator(part_path):
+    """
+    Returns the validator saved for a .part file, or None
+    """
+    try:
+        with open(part_path + '.json', 'r', encoding='utf-8') as file:
+            return json.load(file).get('validator')
+    except (OSError, ValueError):
+        return None
+
+def _discard_validator(part_path):
+    """
+    Removes the validator saved for a .part file once it is no longer needed
+    """
+    try:
+        os.remove(part_path + '.json')
+    except FileNotFoundError:
+        pass
+
+def _request_part(session, url, part_path, timeout):
+    """
+    Requests url, asking only for the bytes missing from part_path
+    Returns (response, offset) where offset is the position in the .part
+    file at which the response body starts (0 means start over)
+    """
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    headers = {}
+    if offset:
+        headers['Range'] = f'bytes={offset}-'
+        # If-Range makes the server send the whole image if it has changed since
+        validator = _load_validator(part_path)
+        if validator:
+            headers['If-Range'] = validator
+    
+    response = session.get(url, headers=headers, timeout=timeout, stream=True)
+    
+    if response.status_code == 416 and offset:
+        # The .part file is no use for the current image - start over
+        response.close()
+        os.remove(part_path)
+        _discard_validator(part_path)
+        return _request_part(session, url, part_path, timeout)
+    
+    try:
         response.raise_for_status()
-        
-        content_type = response.headers.get('content-type', '')
-        if not content_type.startswith('image/'):
-            raise ValueError(f"URL does not point to an image. Content-Type: {content_type}")
-        
-        filename = extract_filename(url, content_type)
+    except requests.exceptions.HTTPError:
+        response.close()
+        raise
+    
+    if response.status_code != 206:
+        offset = 0
+    return response, offset
+
+def _stream_resumable(session, url, part_path, response, chunks, offset, chunk_size,
+                      timeout, max_attempts):
+    """
+    Writes the body chunks of response into part_path starting at offset
+    If the connection drops, the remaining bytes are re-requested with a
+    Range header, up to max_attempts attempts in total. The .part file is
+    kept when every attempt fails so a later call can carry on from there
+    The image's validator is only saved next to the .part file once its
+    bytes are about to be written, so a rejected or cancelled download
+    leaves nothing behind
+    """
+    attempt = 1
+    while True:
+        try:
+            if response is None:
+                response, offset = _request_part(session, url, part_path, timeout)
+                chunks = response.iter_content(chunk_size=chunk_size)
+            if offset == 0:
+                _save_validator(part_path, response)
+            with response, open(part_path, 'ab' if offset else 'wb') as file:
+                _write_stream(chunks, file)
+            return
+        except RESUMABLE_ERRORS:
+            response = None
+            if attempt >= max_attempts:
+                raise
+            attempt += 1
+
+def _download_ranges(session, url, download_dir, chunk_size, timeout, max_attempts,
+                     parts, threshold):
+    """
+    Fetches a large image as `parts` byte ranges in parallel
+    Returns (temp_path, HEAD response), or None when the server does not
+    advertise byte ranges or the image is smaller than threshold
+    """
+    try:
+        head = session.head(url, timeout=timeout, allow_redirects=True)
+        head.raise_for_status()
+    except requests.exceptions.RequestException:
+        # Some servers reject HEAD; fall back to a normal download
+        return None
+    
+    size = int(head.headers.get('Content-Length') or 0)
+    if head.headers.get('Accept-Ranges', '').lower() != 'bytes' or size < threshold:
+        return None
+    # Anything not labelled as an image takes the streaming path, which can
+    # reject a non-image after its first few hundred bytes
+    if not head.headers.get('content-type', '').startswith('image/'):
+        return None
+    validator = _range_validator(head)
+    
+    # Pre-size the file so every range can be written at its own offset
+    fd, temp_path = tempfile.mkstemp(dir=download_dir, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as file:
+        file.truncate(size)
+    
+    step = -(-size // parts)
+    ranges = [(start, min(start + step, size) - 1) for start in range(0, size, step)]
+    
+    try:
+        with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+            futures = [
+                executor.submit(_fetch_range, session, head.url, temp_path, start, end,
+                                validator, chunk_size, timeout, max_attempts)
+                for start, end in ranges
+            ]
+            for future in futures:
+                future.result()
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    
+    return temp_path, head
+
+def _fetch_range(session, url, temp_path, start, end, validator, chunk_size, timeout,
+                 max_attempts):
+    """
+    Downloads bytes start..end (inclusive) of url into the same offsets of temp_path
+    A dropped connection carries on from the last byte written
+    """
+    position = start
+    with open(temp_path, 'r+b') as file:
+        for attempt in range(1, max_attempts + 1):
+            headers = {'Range': f'bytes={position}-{end}'}
+            if validator:
+                headers['If-Range'] = validator
+            try:
+                with session.get(url, headers=headers, timeout=timeout, stream=True) as response:
+                    response.raise_for_status()
+                    if response.status_code != 206:
+                        raise ValueError("Server stopped honouring byte ranges; the image may have changed")
+                    file.seek(position)
+                    for chunk in response.iter_content(chunk_size=chunk_size):
+                        if chunk:
+                            chunk = chunk[:end + 1 - position]
+                            file.write(chunk)
+                            position += len(chunk)
+            except RESUMABLE_ERRORS:
+                if attempt == max_attempts:
+                    raise
+            if position > end:
+                return
+    
+    raise IOError(f"Bytes {start}-{end} of {url} still incomplete after {max_attempts} attempts")
+
+def _publish_file(temp_path, download_dir, filename):
+    """
+    Atomically moves a finished temp file to a free name in download_dir
+    Returns the final path
+    """
+    # Handle filename conflicts
+    counter = 1
+    name, ext = os.path.splitext(filename)
+    with _filename_lock:
         filepath = os.path.join(download_dir, filename)
-        
-        # Handle filename conflicts
-        counter = 1
-        name, ext = os.path.splitext(filename)
         while os.path.exists(filepath):
             filename = f"{name}_{counter}{ext}"
             filepath = os.path.join(download_dir, filename)
             counter += 1
+        os.replace(temp_path, filepath)
+    
+    return filepath
+
+def _refresh_file(temp_path, old_path, filename):
+    """
+    Replaces the file cached for a URL whose image has changed, so a refresh
+    does not leave the old copy behind under its name
+    Returns the path, or None if the new image needs a different extension
+    (the old file is then removed and the caller publishes a new one)
+    """
+    if os.path.splitext(old_path)[1].lower() == os.path.splitext(filename)[1].lower():
+        os.replace(temp_path, old_path)
+        return old_path
+    try:
+        os.remove(old_path)
+    except OSError:
+        pass
+    return None
+
+class DownloadStats:
+    """
+    Aggregates per-download metrics dicts into run totals
+    Safe to update from several threads; summary() also breaks throughput
+    down per host so slow servers stand out
+    """
+    
+    def __init__(self, total=0):
+        self.total = total
+        self.started = time.perf_counter()
+        self.succeeded = 0
+        self.failed = 0
+        self.bytes = 0
+        self.bytes_saved = 0
+        self.cache_hits = 0
+        self.retries = 0
+        self.ttfb_sum = 0.0
+        self.hosts = {}
+        self._lock = threading.Lock()
+    
+    def add(self, metrics):
+        """Adds one finished download's metrics"""
+        with self._lock:
+            if metrics.get('error'):
+                self.failed += 1
+            else:
+                self.succeeded += 1
+                self.ttfb_sum += metrics.get('ttfb', 0.0)
+            self.bytes += metrics.get('bytes', 0)
+            self.bytes_saved += metrics.get('bytes_saved', 0)
+            self.cache_hits += bool(metrics.get('cache_hit'))
+            self.retries += metrics.get('retries', 0)
+            
+            host = self.hosts.setdefault(metrics.get('host', ''), {'downloads': 0, 'bytes': 0, 'time': 0.0})
+            host['downloads'] += 1
+            host['bytes'] += metrics.get('bytes', 0)
+            host['time'] += metrics.get('total_time', 0.0)
+    
+    def summary(self):
+        """Returns the aggregate figures as a plain dict"""
+        with self._lock:
+            elapsed = time.perf_counter() - self.started
+            return {
+                'total': self.total,
+                'succeeded': self.succeeded,
+                'failed': self.failed,
+                'elapsed': elapsed,
+                'bytes': self.bytes,
+                'bytes_per_sec': self.bytes / elapsed if elapsed else 0.0,
+                'bytes_saved': self.bytes_saved,
+                'cache_hits': self.cache_hits,
+                'retries': self.retries,
+                'mean_ttfb': self.ttfb_sum / self.succeeded if self.succeeded else 0.0,
+                'hosts': {
+                    name: dict(host, bytes_per_sec=host['bytes'] / host['time'] if host['time'] else 0.0)
+                    for name, host in self.hosts.items()
+                },
+            }
+    
+    def progress_line(self):
+        """One-line progress summary for redrawing in a terminal"""
+        summary = self.summary()
+        done = summary['succeeded'] + summary['failed']
+        return (f"{done}/{summary['total']} done, {summary['failed']} failed | "
+                f"{summary['bytes'] / 1048576:,.1f} MB at {summary['bytes_per_sec'] / 1048576:,.2f} MB/s | "
+                f"{summary['cache_hits']} cached, {summary['retries']} retries")
+
+class MetricsLog:
+    """
+    Appends each download's metrics dict to a JSON-lines file
+    Instances are callable, so one can be passed straight in as on_metrics
+    """
+    
+    def __init__(self, path):
+        self._file = open(path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+    
+    def __call__(self, metrics):
+        record = dict(metrics, logged_at=time.time())
+        with self._lock:
+            self._file.write(json.dumps(record) + '\n')
+            self._file.flush()
+    
+    def close(self):
+        self._file.close()
+
+class TokenBucket:
+    """
+    Token-bucket rate limit: allows `rate` requests per second on average with
+    bursts of up to `burst` requests (rate None means no limit). pause() stops
+    all requests for a while, e.g. when the server sends Retry-After
+    """
+    
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+    
+    def try_acquire(self):
+        """Takes a token if one is available and returns 0, otherwise returns the seconds until one is"""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+            if self.rate is None:
+                return 0.0
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+    
+    def acquire(self):
+        """Blocks until a token is available and takes it"""
+        while True:
+            wait_time = self.try_acquire()
+            if not wait_time:
+                return
+            time.sleep(wait_time)
+    
+    def pause(self, seconds):
+        """Holds back all requests for the next `seconds`"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+class HostRateLimiter:
+    """
+    Keeps a TokenBucket per host so each server sees at most `rate` requests
+    per second while other hosts run at full speed. host_rates maps a host to
+    its own (rate, burst) pair. With rate None (the default) hosts are not
+    limited up front, but a host is still paused when it answers 429/503
+    """
+    
+    def __init__(self, rate=None, burst=10, host_rates=None):
+        self.rate = rate
+        self.burst = burst
+        self.host_rates = host_rates or {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+    
+    def bucket(self, host):
+        """Returns the TokenBucket for a host, creating it on first use"""
+        with self._lock:
+            if host not in self._buckets:
+                rate, burst = self.host_rates.get(host, (self.rate, self.burst))
+                self._buckets[host] = TokenBucket(rate, burst)
+            return self._buckets[host]
+    
+    def try_acquire(self, host):
+        return self.bucket(host).try_acquire()
+    
+    def acquire(self, host):
+        self.bucket(host).acquire()
+    
+    def pause(self, host, seconds):
+        self.bucket(host).pause(seconds)
+
+class ContentStore:
+    """
+    Content-addressed image store for a download directory
+    Each distinct image is saved once as objects/<aa>/<digest><ext>, and an
+    append-only index.jsonl maps URLs and friendly names to digests. The
+    index is held in dictionaries, so lookups and name checks are O(1)
+    """
+    
+    def __init__(self, root):
+        self.root = root
+        self.index_path = os.path.join(root, 'index.jsonl')
+        self._lock = threading.Lock()
+        self._objects = {}  # digest -> path relative to root
+        self._urls = {}     # url -> digest
+        self._names = {}    # friendly name -> digest
+        self._load()
+    
+    def _load(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as index:
+                for line in index:
+                    try:
+                        self._apply(json.loads(line))
+                    except (ValueError, KeyError):
+                        continue  # Skip a line cut short by an interrupted run
+        except FileNotFoundError:
+            pass
+    
+    def _apply(self, record):
+        self._objects.setdefault(record['digest'], record['path'])
+        self._urls[record['url']] = record['digest']
+        self._names[record['name']] = record['digest']
+    
+    def path_for(self, digest):
+        """Returns the stored path for a digest, or None"""
+        relative = self._objects.get(digest)
+        return os.path.join(self.root, relative) if relative else None
+    
+    def lookup_url(self, url):
+        """Returns the stored path last downloaded from url, or None"""
+        digest = self._urls.get(url)
+        return self.path_for(digest) if digest else None
+    
+    def lookup_name(self, name):
+        """Returns the stored path behind a friendly name, or None"""
+        digest = self._names.get(name)
+        return self.path_for(digest) if digest else None
+    
+    def add(self, temp_path, digest, url, filename):
+        """
+        Moves a finished download into the store, or discards it if the same
+        bytes are already stored, and records url and filename in the index
+        Returns the stored path
+        """
+        with self._lock:
+            relative = self._objects.get(digest)
+            if relative is None or not os.path.exists(os.path.join(self.root, relative)):
+                extension = os.path.splitext(filename)[1]
+                relative = f"objects/{digest[:2]}/{digest}{extension}"
+                os.makedirs(os.path.join(self.root, 'objects', digest[:2]), exist_ok=True)
+                os.replace(temp_path, os.path.join(self.root, relative))
+                self._objects[digest] = relative
+            else:
+                os.remove(temp_path)
+            
+            # A friendly name already used for different bytes gets the digest appended
+            owner = self._names.get(filename)
+            if owner is not None and owner != digest:
+                name, ext = os.path.splitext(filename)
+                filename = f"{name}_{digest[:8]}{ext}"
+            
+            record = {'url': url, 'name': filename, 'digest': digest, 'path': relative}
+            with open(self.index_path, 'a', encoding='utf-8') as index:
+                index.write(json.dumps(record) + '\n')
+            self._apply(record)
         
-        with open(filepath, 'wb') as file:
-            file.write(response.content)
+        return os.path.join(self.root, relative)
+
+# One ContentStore per download directory, shared by all download threads
+_content_stores = {}
+_content_stores_lock = threading.Lock()
+
+def get_content_store(download_dir="Fetched_Images"):
+    """
+    Returns the shared ContentStore for a download directory
+    """
+    key = os.path.abspath(download_dir)
+    with _content_stores_lock:
+        if key not in _content_stores:
+            _content_stores[key] = ContentStore(download_dir)
+        return _content_stores[key]
+
+class HttpCache:
+    """
+    Persistent ETag / Last-Modified cache for repeat downloads, kept in SQLite
+    Each URL maps to its validators, size, local path and when it was last
+    confirmed fresh. Entries older than max_age seconds are evicted, and when
+    there are more than max_entries or their files add up to more than
+    max_bytes the least recently confirmed are evicted first. Evicting only
+    forgets the metadata - the downloaded image itself is left alone
+    """
+    
+    def __init__(self, path, max_age=30 * 24 * 3600, max_entries=100000, max_bytes=None):
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, "
+                "size INTEGER, path TEXT, stored_at REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS entries_age ON entries (stored_at)")
+    
+    @staticmethod
+    def conditional_headers(entry):
+        """Returns the If-None-Match / If-Modified-Since headers for a cache entry"""
+        headers = {}
+        if entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+    
+    def get(self, url):
+        """
+        Returns the cache entry for url as a dict, or None if there is none,
+        it has expired, or its file has gone missing or changed size
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT etag, last_modified, size, path, stored_at FROM entries WHERE url = ?",
+                (url,)
+            ).fetchone()
+        if row is None:
+            return None
         
-        return filepath
+        entry = dict(zip(('etag', 'last_modified', 'size', 'path', 'stored_at'), row))
+        try:
+            intact = os.path.getsize(entry['path']) == entry['size']
+        except OSError:
+            intact = False
+        if not intact or time.time() - entry['stored_at'] > self.max_age:
+            self.forget(url)
+            return None
+        return entry
+    
+    def put(self, url, headers, path):
+        """
+        Records a finished download; responses without an ETag or
+        Last-Modified header cannot be revalidated and are not cached
+        """
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
         
-    except Exception as e:
-        print(f"Error downloading {url}: {e}")
-        return None
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, os.path.getsize(path), path, time.time())
+            )
+            self._evict()
+    
+    def touch(self, url):
+        """Marks an entry as confirmed fresh after a 304 reply"""
+        with self._lock, self._db:
+            self._db.execute("UPDATE entries SET stored_at = ? WHERE url = ?", (time.time(), url))
+    
+    def forget(self, url):
+        """Removes the entry for url"""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM entries WHERE url = ?", (url,))
+    
+    def _evict(self):
+        # Caller holds the lock and an open transaction
+        self._db.execute("DELETE FROM entries WHERE stored_at < ?", (time.time() - self.max_age,))
+        
+        count = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        if count > self.max_entries:
+            self._db.execute(
+                "DELETE FROM entries WHERE url IN "
+                "(SELECT url FROM entries ORDER BY stored_at LIMIT ?)",
+                (count - self.max_entries,)
+            )
+        
+        if self.max_bytes is not None:
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total > self.max_bytes:
+                oldest = self._db.execute("SELECT url, size FROM entries ORDER BY stored_at")
+                evicted = []
+                for url, size in oldest:
+                    if total <= self.max_bytes:
+                        break
+                    evicted.append((url,))
+                    total -= size
+                self._db.executemany("DELETE FROM entries WHERE url = ?", evicted)
+
+# One HttpCache per download directory, shared by all download threads
+_http_caches = {}
+_http_caches_lock = threading.Lock()
+
+def get_http_cache(download_dir="Fetched_Images"):
+    """
+    Returns the shared HttpCache stored in a download directory
+    """
+    key = os.path.abspath(download_dir)
+    with _http_caches_lock:
+        if key not in _http_caches:
+            _http_caches[key] = HttpCache(os.path.join(download_dir, '.http_cache.sqlite3'))
+        return _http_caches[key]
 
 if __name__ == "__main__":
     # Install requests if not available
@@ -0,0 +1,236 @@
+# Offline benchmark for the Week 6 image downloader
+# Starts a local HTTP server that serves synthetic images and measures
+# download_single_image and download_batch against it - no network needed
+#
+# Example: python wk-6-benchmark.py --images 500 --size 262144 --latency 0.05 --workers 16
+
+import argparse
+import importlib.util
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+try:
+    import resource  # Unix only - used for the process-wide peak RSS
+except ImportError:
+    resource = None
+
+def load_downloader():
+    """
+    Imports wk-6-assignment.py (its file name is not a valid module name)
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'wk-6-assignment.py')
+    spec = importlib.util.spec_from_file_location('image_downloader', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def make_image(size):
+    """
+    Returns `size` bytes that start with a JPEG signature so the downloader accepts them
+    """
+    header = b'\xff\xd8\xff\xe0\x00\x10JFIF\x00'
+    return header + os.urandom(max(size - len(header), 0))
+
+class SyntheticImageServer:
+    """
+    Local HTTP stand-in for an image CDN
+    Every GET returns one of the synthetic images after `latency` seconds
+    (plus up to `jitter` more); a share `error_rate` of requests gets a 503
+    """
+
+    def __init__(self, sizes, latency=0.0, jitter=0.0, error_rate=0.0, seed=0):
+        self.images = [make_image(size) for size in sizes]
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def urls(self, count):
+        """Returns `count` distinct image URLs, cycling through the configured sizes"""
+        return [f"{self.base_url}/images/{i}-{i % len(self.images)}.jpg" for i in range(count)]
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive, like a real CDN
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                    delay = server.latency + server._random.uniform(0, server.jitter)
+                    fail = server._random.random() < server.error_rate
+                    if fail:
+                        server.errors += 1
+                time.sleep(delay)
+
+                if fail:
+                    self.send_response(503)
+                    self.send_header('Content-Length', '0')
+                    self.send_header('Retry-After', '0')
+                    self.end_headers()
+                    return
+
+                index = int(self.path.rsplit('-', 1)[-1].split('.')[0]) % len(server.images)
+                body = server.images[index]
+                self.send_response(200)
+                self.send_header('Content-Type', 'image/jpeg')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Keep benchmark output readable
+
+        return Handler
+
+def percentile(values, fraction):
+    """
+    Returns the given percentile (0-1) of a list of numbers, or 0.0 if empty
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def peak_rss_mb():
+    """
+    Peak resident memory of this process in MB, or None where unavailable
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / 1048576 if sys.platform == 'darwin' else peak / 1024
+
+def run_scenario(name, action, urls):
+    """
+    Runs action(urls, on_metrics) and returns throughput, latency and memory figures
+    """
+    collected = []
+    lock = threading.Lock()
+
+    def on_metrics(metrics):
+        with lock:
+            collected.append(metrics)
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    action(urls, on_metrics)
+    elapsed = time.perf_counter() - started
+    _, peak_traced = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    succeeded = [m for m in collected if not m.get('error')]
+    latencies = [m['total_time'] for m in succeeded]
+    total_bytes = sum(m.get('bytes', 0) for m in succeeded)
+    return {
+        'name': name,
+        'downloads': len(urls),
+        'succeeded': len(succeeded),
+        'elapsed': elapsed,
+        'images_per_sec': len(succeeded) / elapsed if elapsed else 0.0,
+        'mb_per_sec': total_bytes / 1048576 / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'mean_ms': statistics.mean(latencies) * 1000 if latencies else 0.0,
+        'retries': sum(m.get('retries', 0) for m in collected),
+        'peak_traced_mb': peak_traced / 1048576,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+def print_results(results):
+    """
+    Prints one row per scenario
+    """
+    print(f"\n{'Scenario':<28}{'OK':>7}{'Time s':>9}{'img/s':>9}{'MB/s':>9}"
+          f"{'p50 ms':>9}{'p99 ms':>9}{'Retries':>9}{'Peak MB':>9}")
+    print("-" * 98)
+    for r in results:
+        print(f"{r['name']:<28}{r['succeeded']:>7}{r['elapsed']:>9.2f}{r['images_per_sec']:>9.1f}"
+              f"{r['mb_per_sec']:>9.1f}{r['p50_ms']:>9.1f}{r['p99_ms']:>9.1f}{r['retries']:>9}"
+              f"{r['peak_traced_mb']:>9.1f}")
+    rss = results[-1]['peak_rss_mb'] if results else None
+    if rss is not None:
+        print(f"\nProcess peak RSS over the whole run: {rss:,.1f} MB")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the image downloader against a local server")
+    parser.add_argument('--images', type=int, default=200, help="downloads per scenario")
+    parser.add_argument('--size', type=int, nargs='+', default=[65536, 1048576],
+                        help="synthetic image sizes in bytes (cycled through)")
+    parser.add_argument('--latency', type=float, default=0.02, help="server delay per request in seconds")
+    parser.add_argument('--jitter', type=float, default=0.0, help="extra random delay per request in seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument('--workers', type=int, nargs='+', default=[4, 16], help="batch worker counts to try")
+    parser.add_argument('--per-host-limit', type=int, default=16)
+    parser.add_argument('--skip-sequential', action='store_true', help="only run the batch scenarios")
+    args = parser.parse_args()
+
+    downloader = load_downloader()
+    server = SyntheticImageServer(args.size, args.latency, args.jitter, args.error_rate).start()
+    print(f"🧪 Serving synthetic images at {server.base_url} "
+          f"(sizes {args.size}, latency {args.latency}s, error rate {args.error_rate:.0%})")
+
+    # Pools must be big enough for the widest scenario or connections get discarded
+    downloader.configure_session(pool_maxsize=max(args.workers + [args.per_host_limit]))
+
+    scenarios = []
+    if not args.skip_sequential:
+        def sequential(urls, on_metrics, target):
+            for url in urls:
+                downloader.download_single_image(url, target, backoff=0.01, on_metrics=on_metrics)
+        scenarios.append(("download_single_image x N", sequential))
+
+    for workers in args.workers:
+        def batch(urls, on_metrics, target, workers=workers):
+            downloader.download_batch(urls, target, max_workers=workers,
+                                      per_host_limit=args.per_host_limit, backoff=0.01,
+                                      on_metrics=on_metrics)
+        scenarios.append((f"download_batch {workers} workers", batch))
+
+    results = []
+    try:
+        for name, action in scenarios:
+            target = tempfile.mkdtemp(prefix='download-bench-')
+            try:
+                print(f"▶️  {name}...")
+                results.append(run_scenario(
+                    name, lambda urls, on_metrics: action(urls, on_metrics, target), server.urls(args.images)))
+            finally:
+                shutil.rmtree(target, ignore_errors=True)
+    finally:
+        server.stop()
+
+    print_results(results)
+    print(f"\nServer handled {server.requests} requests ({server.errors} injected errors)")
+
+if __name__ == "__main__":
+    main()
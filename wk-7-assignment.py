@@ -1,14 +1,46 @@
 # Data Analysis and Visualization Assignment
 # Using the Iris Dataset for demonstration
 
+import argparse
+import hashlib
+import inspect
+import io
+import json
+import os
+import pickle
 import pandas as pd
 import matplotlib.pyplot as plt
+from matplotlib.colors import LogNorm
 import seaborn as sns
 import numpy as np
 from sklearn.datasets import load_iris
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import warnings
 warnings.filterwarnings('ignore')
 
+# Rows read per chunk when a large CSV/Parquet file is streamed
+CHUNK_ROWS = 500_000
+
+# Rows kept per group (and overall) for medians, quartiles and plots of streamed data
+SAMPLE_ROWS = 10_000
+
+# Rows read from the top of a CSV to tell its numeric measurement columns from the rest
+SCHEMA_SAMPLE_ROWS = 1_000
+
+# Bytes of CSV each worker process reads when statistics are computed in parallel
+PART_BYTES = 64 * 1024 * 1024
+
+# Above this many plotted rows the charts switch to density plots and downsampled lines
+LARGE_DATA_ROWS = 100_000
+LINE_POINTS = 1_000      # Points per species kept by LTTB in the large-data line chart
+DENSITY_BINS = 60        # Bins per axis of the large-data scatter density
+
+# Headless export: size and resolution of each panel's own figure, and the file
+# keeping the content hash of every exported panel
+PANEL_SIZE = (8, 6.5)
+EXPORT_DPI = 150
+EXPORT_MANIFEST = '.export-manifest.json'
+
 # Set style for better looking plots
 plt.style.use('seaborn-v0_8')
 sns.set_palette("husl")
@@ -61,30 +93,356 @@ def load_and_explore_data():
         print(f"❌ Error loading dataset: {e}")
         return None
 
+# Task 1 for large files: stream the dataset instead of loading it
+def explore_dataset_file(path, label_column='species', chunk_rows=CHUNK_ROWS, workers=1, columns=None):
+    """Explore a large CSV/Parquet file chunk by chunk and return its statistics"""
+    print("\n📊 TASK 1: LOADING AND EXPLORING THE DATASET")
+    print("-" * 40)
+    
+    # Only the first few rows are read to show what the data looks like
+    first_rows = next(load_dataset_chunks(path, label_column, chunk_rows=5, columns=columns), None)
+    if first_rows is None:
+        raise ValueError(f"{path} contains no rows")
+    print(f"✅ Streaming '{path}' in chunks of {chunk_rows:,} rows")
+    
+    print("\n🔍 First 5 rows of the dataset:")
+    print(first_rows.head())
+    
+    print("\n📋 Column types used while streaming:")
+    print(first_rows.dtypes)
+    
+    stats = compute_file_statistics(path, label_column, chunk_rows, workers, columns=columns)
+    print(f"\n📁 Dataset shape: ({stats['rows']}, {len(stats['columns']) + 1})")
+    
+    print("\n🔎 Missing values check:")
+    print(stats['missing'])
+    return stats
+
+def load_dataset_chunks(path, label_column='species', chunk_rows=CHUNK_ROWS, columns=None):
+    """Stream the label and measurement columns of a CSV or Parquet file as DataFrame chunks with compact dtypes"""
+    dtypes = _dataset_dtypes(path, label_column, columns)
+    if _is_parquet(path):
+        for chunk in _read_parquet_chunks(path, chunk_rows, list(dtypes)):
+            yield chunk.astype(dtypes)
+    else:
+        yield from pd.read_csv(path, usecols=list(dtypes), dtype=dtypes, chunksize=chunk_rows)
+
+def _dataset_dtypes(path, label_column, columns=None):
+    """Explicit dtypes for the label and measurement columns of a CSV/Parquet file
+    
+    The measurements are the given columns, or else every numeric column
+    (judged from the Parquet schema, or the first SCHEMA_SAMPLE_ROWS rows
+    of a CSV); ids, dates and text are left out
+    """
+    file_columns = _dataset_columns(path)
+    if label_column not in file_columns:
+        raise ValueError(f"Label column '{label_column}' not found in {path}")
+    if columns is None:
+        columns = _numeric_columns(path)
+    missing = [col for col in columns if col not in file_columns]
+    if missing:
+        raise ValueError(f"Column(s) {', '.join(map(repr, missing))} not found in {path}")
+    columns = [col for col in file_columns if col in columns and col != label_column]
+    if not columns:
+        raise ValueError(f"{path} has no numeric columns to analyse besides '{label_column}'")
+    
+    # Categorical labels and float32 measurements take a fraction of the default memory
+    dtypes = {col: 'float32' for col in columns}
+    dtypes[label_column] = 'category'
+    return dtypes
+
+def _numeric_columns(path):
+    """Names of the integer and floating point columns of a CSV/Parquet file"""
+    if _is_parquet(path):
+        import pyarrow.types as types
+        schema = _parquet_module().ParquetFile(path).schema_arrow
+        return [field.name for field in schema if types.is_integer(field.type) or types.is_floating(field.type)]
+    sample = pd.read_csv(path, nrows=SCHEMA_SAMPLE_ROWS)
+    return [col for col in sample.columns
+            if pd.api.types.is_numeric_dtype(sample[col]) and not pd.api.types.is_bool_dtype(sample[col])]
+
+def _is_parquet(path):
+    return os.path.splitext(path)[1].lower() in ('.parquet', '.pq')
+
+def _dataset_columns(path):
+    """Column names of a CSV/Parquet file, read without loading any data"""
+    if _is_parquet(path):
+        return _parquet_module().ParquetFile(path).schema_arrow.names
+    return list(pd.read_csv(path, nrows=0).columns)
+
+def _read_parquet_chunks(path, chunk_rows, columns=None):
+    for batch in _parquet_module().ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=columns):
+        yield batch.to_pandas()
+
+def _parquet_module():
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Streaming Parquet files needs pyarrow (pip install pyarrow)")
+    return pq
+
+# Aggregation Engine: every statistic the tasks print or plot, computed once
+def compute_statistics(chunks, label_column='species', sample_rows=SAMPLE_ROWS, seed=0):
+    """Compute every statistic the analysis needs in one pass over the chunks
+    
+    Each chunk becomes a partial aggregate (chunk_aggregates) that is merged
+    into the running total, so memory stays bounded by one chunk.
+    Counts, means, standard deviations, extremes and correlations are exact.
+    Medians and quartiles come from a uniform sample of up to sample_rows
+    rows per group (and overall), so they are exact until a group is bigger
+    """
+    total = None
+    for part, chunk in enumerate(chunks):
+        total = merge_aggregates(total, chunk_aggregates(chunk, label_column, sample_rows, seed, part))
+    if total is None:
+        raise ValueError("The dataset contains no rows")
+    return finish_aggregates(total)
+
+def compute_file_statistics(path, label_column='species', chunk_rows=CHUNK_ROWS, workers=1,
+                            sample_rows=SAMPLE_ROWS, seed=0, columns=None):
+    """compute_statistics for a CSV/Parquet file, optionally in several processes
+    
+    With workers > 1 each worker reads and aggregates its own part of the
+    file (a Parquet row group, or a CSV byte range that starts and ends on
+    a line break) and only the small partial aggregates are sent back.
+    CSV files with line breaks inside quoted values need workers=1.
+    columns picks the measurement columns; by default every numeric one
+    """
+    if workers <= 1:
+        chunks = load_dataset_chunks(path, label_column, chunk_rows, columns)
+        return compute_statistics(chunks, label_column, sample_rows, seed)
+    
+    # The parts after the first have no header, so the workers get the column names in file order
+    dtypes = _dataset_dtypes(path, label_column, columns)
+    columns = _dataset_columns(path)
+    total = None
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_aggregate_file_part, path, part, location, columns, dtypes, label_column,
+                                   sample_rows, seed)
+                   for part, location in enumerate(_file_parts(path))]
+        for future in as_completed(futures):
+            total = merge_aggregates(total, future.result())
+    if total is None:
+        raise ValueError("The dataset contains no rows")
+    return finish_aggregates(total)
+
+def _file_parts(path, part_bytes=PART_BYTES):
+    """Independent parts of a file: Parquet row groups or newline-aligned CSV byte ranges"""
+    if _is_parquet(path):
+        return list(range(_parquet_module().ParquetFile(path).num_row_groups))
+    
+    size = os.path.getsize(path)
+    parts = []
+    with open(path, 'rb') as file:
+        start = len(file.readline())   # Skip the header
+        while start < size:
+            end = min(start + part_bytes, size)
+            if end < size:
+                file.seek(end)
+                end += len(file.readline())
+            parts.append((start, end))
+            start = end
+    return parts
+
+def _aggregate_file_part(path, part, location, columns, dtypes, label_column, sample_rows, seed):
+    """Read one part of a file in a worker process and return its partial aggregates"""
+    if _is_parquet(path):
+        chunk = _parquet_module().ParquetFile(path).read_row_group(location, columns=list(dtypes))
+        chunk = chunk.to_pandas().astype(dtypes)
+    else:
+        start, end = location
+        with open(path, 'rb') as file:
+            file.seek(start)
+            data = file.read(end - start)
+        chunk = pd.read_csv(io.BytesIO(data), header=None, names=columns, usecols=list(dtypes), dtype=dtypes)
+    return chunk_aggregates(chunk, label_column, sample_rows, seed, part)
+
+def chunk_aggregates(chunk, label_column='species', sample_rows=SAMPLE_ROWS, seed=0, part=0):
+    """Partial aggregates of one chunk, ready for merge_aggregates
+    
+    part numbers the chunk in file order; it seeds the chunk's sample keys
+    and keeps the sampled rows in file order
+    """
+    columns = [col for col in chunk.columns if col != label_column]
+    values = chunk[columns].astype('float64')
+    labels = chunk[label_column]
+    
+    # Rows without missing values, kept as co-moments around their mean for the correlations
+    complete = values.dropna().to_numpy()
+    center = complete.mean(axis=0) if len(complete) else np.zeros(len(columns))
+    deviations = complete - center
+    
+    # Keeping the rows with the smallest random keys is a uniform sample of everything seen
+    rng = np.random.default_rng([seed, part])
+    keyed = chunk.assign(_key=rng.random(len(chunk)), _part=part, _position=np.arange(len(chunk)))
+    
+    group_rows = labels.value_counts(sort=False)
+    group_rows.index = group_rows.index.astype(object)
+    return {
+        'label_column': label_column,
+        'columns': columns,
+        'rows': len(chunk),
+        'missing': chunk.isnull().sum(),
+        'group_rows': group_rows[group_rows > 0],
+        'groups': _moments(values, labels),
+        'total': _moments(values, np.zeros(len(chunk), dtype=int)),
+        'co_moments': (len(complete), center, deviations.T @ deviations),
+        'group_sample': keyed.sort_values('_key').groupby(label_column, observed=True).head(sample_rows),
+        'total_sample': keyed.nsmallest(sample_rows, '_key'),
+        'sample_rows': sample_rows,
+    }
+
+def _moments(values, keys):
+    """Count, mean, sum of squared deviations (m2), min and max per key, from one groupby"""
+    table = values.groupby(keys, observed=True).agg(['count', 'mean', 'var', 'min', 'max'])
+    table.index = table.index.astype(object)   # Chunks may carry different category sets
+    moments = {stat: table.xs(stat, axis=1, level=1) for stat in ['count', 'mean', 'var', 'min', 'max']}
+    moments['m2'] = (moments.pop('var') * (moments['count'] - 1)).fillna(0)
+    return moments
+
+def merge_aggregates(total, part):
+    """Merge two partial aggregates; the result is the same in any order"""
+    if total is None:
+        return part
+    sample_rows = total['sample_rows']
+    label_column = total['label_column']
+    group_sample = pd.concat([total['group_sample'], part['group_sample']])
+    total_sample = pd.concat([total['total_sample'], part['total_sample']])
+    return {
+        'label_column': label_column,
+        'columns': total['columns'],
+        'rows': total['rows'] + part['rows'],
+        'missing': total['missing'].add(part['missing'], fill_value=0).astype(int),
+        'group_rows': total['group_rows'].add(part['group_rows'], fill_value=0).astype(int),
+        'groups': _merge_moments(total['groups'], part['groups']),
+        'total': _merge_moments(total['total'], part['total']),
+        'co_moments': _merge_co_moments(total['co_moments'], part['co_moments']),
+        'group_sample': group_sample.sort_values('_key').groupby(label_column, observed=True).head(sample_rows),
+        'total_sample': total_sample.nsmallest(sample_rows, '_key'),
+        'sample_rows': sample_rows,
+    }
+
+def _merge_moments(a, b):
+    """Combine per-key moments with the parallel Welford update (Chan et al.)"""
+    index = a['count'].index.union(b['count'].index)
+    a = {stat: table.reindex(index) for stat, table in a.items()}
+    b = {stat: table.reindex(index) for stat, table in b.items()}
+    
+    count_a, count_b = a['count'].fillna(0), b['count'].fillna(0)
+    count = count_a + count_b
+    share_b = (count_b / count).fillna(0)
+    delta = b['mean'].fillna(0) - a['mean'].fillna(0)
+    return {
+        'count': count,
+        'mean': (a['mean'].fillna(0) + delta * share_b).where(count > 0),
+        'm2': a['m2'].fillna(0) + b['m2'].fillna(0) + delta ** 2 * count_a * share_b,
+        'min': np.fmin(a['min'], b['min']),
+        'max': np.fmax(a['max'], b['max']),
+    }
+
+def _merge_co_moments(a, b):
+    """Combine (rows, mean vector, co-moment matrix) of two sets of complete rows"""
+    count_a, center_a, comoment_a = a
+    count_b, center_b, comoment_b = b
+    count = count_a + count_b
+    if count == 0:
+        return a
+    delta = center_b - center_a
+    center = center_a + delta * count_b / count
+    comoment = comoment_a + comoment_b + np.outer(delta, delta) * count_a * count_b / count
+    return count, center, comoment
+
+def finish_aggregates(total):
+    """Turn merged partial aggregates into the tables the tasks print and plot"""
+    label_column = total['label_column']
+    columns = total['columns']
+    
+    sample = total['group_sample'].sort_values(['_part', '_position'])
+    sample = sample.drop(columns=['_key', '_part', '_position']).reset_index(drop=True)
+    sample[label_column] = sample[label_column].astype('category')
+    total_sample = total['total_sample'][columns].astype('float64')
+    
+    groups = _finish_moments(total['groups'])
+    grouped_sample = sample[columns].astype('float64').groupby(sample[label_column], observed=True)
+    groups['median'] = grouped_sample.median()
+    groups['25%'] = grouped_sample.quantile(0.25)
+    groups['75%'] = grouped_sample.quantile(0.75)
+    for stat in groups:
+        groups[stat].index = groups[stat].index.astype(object)
+        groups[stat].index.name = label_column
+    overall = _finish_moments(total['total'])
+    quartiles = total_sample.quantile([0.25, 0.5, 0.75])
+    
+    describe = pd.DataFrame({
+        'count': overall['count'].iloc[0],
+        'mean': overall['mean'].iloc[0],
+        'std': overall['std'].iloc[0],
+        'min': overall['min'].iloc[0],
+        '25%': quartiles.loc[0.25],
+        '50%': quartiles.loc[0.5],
+        '75%': quartiles.loc[0.75],
+        'max': overall['max'].iloc[0],
+    }).T
+    
+    count, _, comoment = total['co_moments']
+    deviation = np.sqrt(np.diag(comoment))
+    correlation = pd.DataFrame(comoment / np.outer(deviation, deviation), index=columns, columns=columns)
+    
+    group_counts = total['group_rows'].sort_values(ascending=False, kind='stable').rename('count')
+    group_counts.index.name = label_column
+    return {
+        'label_column': label_column,
+        'columns': columns,
+        'rows': total['rows'],
+        'missing': total['missing'],
+        'group_counts': group_counts,
+        'groups': groups,
+        'describe': describe,
+        'correlation': correlation,
+        'sample': sample,
+    }
+
+def _finish_moments(moments):
+    """Count, mean, std (ddof=1), min and max tables from merged moments"""
+    return {
+        'count': moments['count'],
+        'mean': moments['mean'],
+        'std': np.sqrt(moments['m2'] / (moments['count'] - 1)),
+        'min': moments['min'],
+        'max': moments['max'],
+    }
+
 # Task 2: Basic Data Analysis
-def perform_data_analysis(df):
-    """Perform basic statistical analysis on the dataset"""
+def perform_data_analysis(stats, iris=False):
+    """Perform basic statistical analysis on the dataset statistics
+    
+    The findings about the Iris species are printed only when iris is set
+    """
     print("\n📈 TASK 2: BASIC DATA ANALYSIS")
     print("-" * 40)
     
     # Basic statistics
     print("📊 Basic statistics for numerical columns:")
-    print(df.describe())
+    print(stats['describe'])
     
     # Statistics by species
-    print("\n🌿 Statistics grouped by species:")
-    numerical_cols = ['sepal length (cm)', 'sepal width (cm)', 'petal length (cm)', 'petal width (cm)']
+    label = stats['label_column']
+    print(f"\n🌿 Statistics grouped by {label}:")
+    groups = stats['groups']
     
-    for col in numerical_cols:
-        print(f"\n{col} by species:")
-        species_stats = df.groupby('species')[col].agg(['mean', 'median', 'std', 'min', 'max'])
+    for col in stats['columns']:
+        print(f"\n{col} by {label}:")
+        species_stats = pd.DataFrame({stat: groups[stat][col] for stat in ['mean', 'median', 'std', 'min', 'max']})
         print(species_stats)
     
     # Correlation analysis
     print("\n🔗 Correlation matrix for numerical features:")
-    correlation_matrix = df[numerical_cols].corr()
+    correlation_matrix = stats['correlation']
     print(correlation_matrix)
     
+    if not iris:
+        return
+    
     # Interesting findings
     print("\n💡 INTERESTING FINDINGS:")
     print("• Setosa species has significantly smaller petals than other species")
@@ -93,127 +451,405 @@ def perform_data_analysis(df):
     print("• Strong positive correlation between petal length and petal width")
 
 # Task 3: Data Visualization
-def create_visualizations(df):
-    """Create various visualizations to understand the data"""
+class GroupIndex:
+    """Row positions of every group, computed once and shared by all plots
+    
+    Rows are put in group order a single time, so every group is one slice:
+    values() returns zero-copy NumPy views instead of building
+    df[df['species'] == species] for each group in each panel
+    """
+    
+    def __init__(self, df, label_column='species'):
+        codes, labels = pd.factorize(df[label_column])   # Labels in order of first appearance
+        self.labels = list(labels)
+        self.order = np.argsort(codes, kind='stable')
+        # Rows without a label (code -1) sort first and belong to no group
+        bounds = np.cumsum(np.bincount(codes + 1, minlength=len(self.labels) + 1))
+        self.slices = {label: slice(bounds[i], bounds[i + 1]) for i, label in enumerate(self.labels)}
+        self._df = df
+        self._sorted = {}
+    
+    def __iter__(self):
+        return iter(self.labels)
+    
+    def positions(self, label):
+        """Row positions (not index labels) of one group, in original order"""
+        return self.order[self.slices[label]]
+    
+    def values(self, label, column):
+        """One column of one group as a NumPy view"""
+        return self._column(column)[self.slices[label]]
+    
+    def index(self, label):
+        """The DataFrame index labels of one group"""
+        return self._column(None)[self.slices[label]]
+    
+    def _column(self, column):
+        # Each column is reordered once, the first time any plot asks for it
+        if column not in self._sorted:
+            data = self._df.index if column is None else self._df[column]
+            self._sorted[column] = data.to_numpy()[self.order]
+        return self._sorted[column]
+
+def create_visualizations(df, stats, groups=None, large_data=None, export_dir=None, formats=('png',),
+                          workers=None):
+    """Create various visualizations to understand the data (stats from compute_statistics)
+    
+    With export_dir every panel is rendered headlessly to its own file
+    there (see export_visualizations) instead of one figure on screen
+    """
     print("\n🎨 TASK 3: DATA VISUALIZATION")
     print("-" * 40)
     
+    # Large data gets density plots, downsampled lines and box plots from quantiles
+    if large_data is None:
+        large_data = len(df) > LARGE_DATA_ROWS
+    if large_data:
+        print(f"🗜️  Large-data mode for {len(df):,} rows")
+    
+    # Each panel only gets the small inputs it draws, prepared from one shared group index
+    inputs = panel_inputs(df, stats, groups, large_data)
+    if export_dir:
+        export_visualizations(inputs, export_dir, formats, workers)
+        return
+    
     # Create a figure with multiple subplots
     fig = plt.figure(figsize=(20, 15))
     
-    # 1. Line Chart - Trends by species (using index as pseudo-time)
-    print("📈 Creating Line Chart...")
-    ax1 = plt.subplot(2, 3, 1)
-    species_colors = {'setosa': 'red', 'versicolor': 'green', 'virginica': 'blue'}
+    for position, (name, message, draw) in enumerate(PANELS, 1):
+        print(message)
+        plt.subplot(2, 3, position)
+        draw(inputs[name])
     
-    for species in df['species'].unique():
-        species_data = df[df['species'] == species]
-        plt.plot(species_data.index[:30], species_data['sepal length (cm)'][:30], 
-                label=species, color=species_colors[species], marker='o', linewidth=2)
+    plt.tight_layout()
+    plt.show()
     
-    plt.title('Sepal Length Trends (First 30 Samples)', fontsize=14, fontweight='bold')
+    print("✅ All visualizations created successfully!")
+
+def panel_inputs(df, stats, groups=None, large_data=False):
+    """The data every panel draws, small enough to send to another process
+    
+    The panels plot every measurement column of the dataset; the line chart
+    and histogram use the first one and the scatter plot puts the third (or
+    the last, with fewer) against it - sepal and petal length for Iris
+    """
+    label = stats['label_column']
+    numerical_cols = list(stats['columns'])
+    x_col = numerical_cols[0]
+    y_col = numerical_cols[2] if len(numerical_cols) > 2 else numerical_cols[-1]
+    
+    # Every panel below reads its per-species data through this one index
+    if groups is None:
+        groups = GroupIndex(df, label)
+    
+    # 1. Line chart: first 30 samples, or the whole series reduced by LTTB
+    lines = []
+    for species in groups:
+        if large_data:
+            x = groups.positions(species)
+            y = groups.values(species, x_col).astype('float64')
+            finite = np.isfinite(y)
+            x, y = x[finite], y[finite]
+            keep = lttb(x, y, LINE_POINTS)
+            lines.append((species, x[keep], y[keep]))
+        else:
+            lines.append((species, groups.index(species)[:30], groups.values(species, x_col)[:30]))
+    
+    # 3. Histogram: counts per species, binned like plt.hist(values, bins=15)
+    histograms = []
+    for species in groups:
+        values = groups.values(species, x_col).astype('float64')
+        counts, edges = np.histogram(values[np.isfinite(values)], bins=15)
+        histograms.append((species, counts, edges))
+    
+    # 4. Scatter: the points, or for large data a 2D histogram of them
+    if large_data:
+        x = df[x_col].to_numpy(dtype='float64')
+        y = df[y_col].to_numpy(dtype='float64')
+        finite = np.isfinite(x) & np.isfinite(y)
+        density = np.histogram2d(x[finite], y[finite], bins=DENSITY_BINS)
+        means = stats['groups']['mean']
+        scatter = {'density': density,
+                   'means': [(species, means.loc[species, x_col], means.loc[species, y_col]) for species in groups]}
+    else:
+        scatter = {'points': [(species, groups.values(species, x_col), groups.values(species, y_col))
+                              for species in groups]}
+    
+    # 5. Box plot: quartiles for large data, otherwise the rows seaborn needs
+    if large_data:
+        boxes = {'stats': {'groups': {stat: stats['groups'][stat] for stat in ['min', '25%', 'median', '75%', 'max']}},
+                 'labels': list(groups)}
+    else:
+        boxes = {'rows': df[[label] + numerical_cols]}
+    
+    return {
+        'line_chart': {'lines': lines, 'large_data': large_data, 'column': x_col},
+        'bar_chart': {'means': stats['groups']['mean'][numerical_cols], 'label': label},
+        'histogram': {'histograms': histograms, 'column': x_col, 'label': label},
+        'scatter_plot': {**scatter, 'columns': (x_col, y_col)},
+        'box_plot': {'columns': numerical_cols, 'label': label, **boxes},
+        'heatmap': {'correlation': stats['correlation'].loc[numerical_cols, numerical_cols]},
+    }
+
+def _display_name(column):
+    """Title-cased name and unit of a column: 'sepal length (cm)' -> ('Sepal Length', 'cm')"""
+    name, _, unit = str(column).partition(' (')
+    return name.title(), unit.rstrip(')')
+
+def _axis_label(name, unit):
+    return f"{name} ({unit})" if unit else name
+
+# Colors of the Iris species; other labels use the default palette
+SPECIES_COLORS = {'setosa': 'red', 'versicolor': 'green', 'virginica': 'blue'}
+
+def draw_line_chart(data):
+    """1. Line Chart - Trends by species (using index as pseudo-time)"""
+    for species, x, y in data['lines']:
+        if data['large_data']:
+            plt.plot(x, y, label=species, color=SPECIES_COLORS.get(species), linewidth=1)
+        else:
+            plt.plot(x, y, label=species, color=SPECIES_COLORS.get(species), marker='o', linewidth=2)
+    
+    name, unit = _display_name(data['column'])
+    if data['large_data']:
+        plt.title(f'{name} Trends (LTTB, {LINE_POINTS:,} Points per Species)', fontsize=14, fontweight='bold')
+    else:
+        plt.title(f'{name} Trends (First 30 Samples)', fontsize=14, fontweight='bold')
     plt.xlabel('Sample Index')
-    plt.ylabel('Sepal Length (cm)')
+    plt.ylabel(_axis_label(name, unit))
     plt.legend()
     plt.grid(True, alpha=0.3)
-    
-    # 2. Bar Chart - Average measurements by species
-    print("📊 Creating Bar Chart...")
-    ax2 = plt.subplot(2, 3, 2)
-    numerical_cols = ['sepal length (cm)', 'sepal width (cm)', 'petal length (cm)', 'petal width (cm)']
-    
-    # Calculate means
-    species_means = df.groupby('species')[numerical_cols].mean()
+
+def draw_bar_chart(data):
+    """2. Bar Chart - Average measurements by species"""
+    # Means come from the shared statistics instead of another groupby
+    species_means = data['means']
     
     # Plot grouped bar chart
     x = np.arange(len(species_means.index))
-    width = 0.2
+    width = 0.8 / len(species_means.columns)
     
-    for i, col in enumerate(numerical_cols):
+    for i, col in enumerate(species_means.columns):
         plt.bar(x + i*width, species_means[col], width, label=col, alpha=0.8)
     
-    plt.title('Average Measurements by Species', fontsize=14, fontweight='bold')
-    plt.xlabel('Species')
-    plt.ylabel('Measurement (cm)')
-    plt.xticks(x + width*1.5, species_means.index)
+    # The unit goes on the axis when every column shares it
+    units = {_display_name(col)[1] for col in species_means.columns}
+    plt.title(f'Average Measurements by {data["label"].title()}', fontsize=14, fontweight='bold')
+    plt.xlabel(data['label'].title())
+    plt.ylabel(_axis_label('Measurement', units.pop() if len(units) == 1 else ''))
+    plt.xticks(x + width*(len(species_means.columns) - 1)/2, species_means.index)
     plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
     plt.grid(True, alpha=0.3, axis='y')
-    
-    # 3. Histogram - Distribution of sepal length
-    print("📊 Creating Histogram...")
-    ax3 = plt.subplot(2, 3, 3)
-    
-    for species in df['species'].unique():
-        species_data = df[df['species'] == species]
-        plt.hist(species_data['sepal length (cm)'], alpha=0.7, label=species, 
-                bins=15, edgecolor='black')
-    
-    plt.title('Distribution of Sepal Length by Species', fontsize=14, fontweight='bold')
-    plt.xlabel('Sepal Length (cm)')
+
+def draw_histogram(data):
+    """3. Histogram - Distribution of sepal length"""
+    for species, counts, edges in data['histograms']:
+        plt.hist(edges[:-1], edges, weights=counts, alpha=0.7, label=species, edgecolor='black')
+    
+    name, unit = _display_name(data['column'])
+    plt.title(f'Distribution of {name} by {data["label"].title()}', fontsize=14, fontweight='bold')
+    plt.xlabel(_axis_label(name, unit))
     plt.ylabel('Frequency')
     plt.legend()
     plt.grid(True, alpha=0.3)
-    
-    # 4. Scatter Plot - Sepal length vs Petal length
-    print("🔵 Creating Scatter Plot...")
-    ax4 = plt.subplot(2, 3, 4)
-    
-    for species in df['species'].unique():
-        species_data = df[df['species'] == species]
-        plt.scatter(species_data['sepal length (cm)'], species_data['petal length (cm)'],
-                   label=species, alpha=0.7, s=60)
-    
-    plt.title('Sepal Length vs Petal Length', fontsize=14, fontweight='bold')
-    plt.xlabel('Sepal Length (cm)')
-    plt.ylabel('Petal Length (cm)')
+
+def draw_scatter_plot(data):
+    """4. Scatter Plot - Sepal length vs Petal length"""
+    if 'density' in data:
+        # Density of all rows, with each species marked at its mean
+        counts, x_edges, y_edges = data['density']
+        plt.pcolormesh(x_edges, y_edges, np.ma.masked_equal(counts.T, 0), cmap='viridis',
+                       norm=LogNorm())
+        plt.colorbar(label='Rows (log scale)')
+        for species, x, y in data['means']:
+            plt.scatter(x, y, label=f"{species} mean", color=SPECIES_COLORS.get(species), marker='X', s=150,
+                       edgecolor='black')
+    else:
+        for species, x, y in data['points']:
+            plt.scatter(x, y, label=species, alpha=0.7, s=60)
+    
+    x_name, x_unit = _display_name(data['columns'][0])
+    y_name, y_unit = _display_name(data['columns'][1])
+    plt.title(f'{x_name} vs {y_name}', fontsize=14, fontweight='bold')
+    plt.xlabel(_axis_label(x_name, x_unit))
+    plt.ylabel(_axis_label(y_name, y_unit))
     plt.legend()
     plt.grid(True, alpha=0.3)
-    
-    # 5. Box Plot - Distribution comparison
-    print("📦 Creating Box Plot...")
-    ax5 = plt.subplot(2, 3, 5)
-    
-    df_melted = pd.melt(df, id_vars=['species'], value_vars=numerical_cols,
-                       var_name='Measurement', value_name='Value')
-    
-    sns.boxplot(data=df_melted, x='Measurement', y='Value', hue='species')
-    plt.title('Distribution of Measurements by Species', fontsize=14, fontweight='bold')
+
+def draw_box_plot(data):
+    """5. Box Plot - Distribution comparison"""
+    label = data['label']
+    if 'stats' in data:
+        # Drawn from the precomputed quartiles - no melted copy of the data
+        boxplot_from_stats(plt.gca(), data['stats'], data['columns'], data['labels'])
+    else:
+        df_melted = pd.melt(data['rows'], id_vars=[label], value_vars=data['columns'],
+                           var_name='Measurement', value_name='Value')
+        
+        sns.boxplot(data=df_melted, x='Measurement', y='Value', hue=label)
+    plt.title(f'Distribution of Measurements by {label.title()}', fontsize=14, fontweight='bold')
     plt.xticks(rotation=45)
     plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
-    
-    # 6. Heatmap - Correlation matrix
-    print("🔥 Creating Heatmap...")
-    ax6 = plt.subplot(2, 3, 6)
-    
-    correlation_matrix = df[numerical_cols].corr()
-    sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0,
+
+def draw_heatmap(data):
+    """6. Heatmap - Correlation matrix"""
+    sns.heatmap(data['correlation'], annot=True, cmap='coolwarm', center=0,
                 square=True, fmt='.2f', cbar_kws={'shrink': 0.8})
     plt.title('Feature Correlation Heatmap', fontsize=14, fontweight='bold')
+
+# The panels in figure order: (name, progress message, drawing function)
+PANELS = [
+    ('line_chart', "📈 Creating Line Chart...", draw_line_chart),
+    ('bar_chart', "📊 Creating Bar Chart...", draw_bar_chart),
+    ('histogram', "📊 Creating Histogram...", draw_histogram),
+    ('scatter_plot', "🔵 Creating Scatter Plot...", draw_scatter_plot),
+    ('box_plot', "📦 Creating Box Plot...", draw_box_plot),
+    ('heatmap', "🔥 Creating Heatmap...", draw_heatmap),
+]
+
+def export_visualizations(inputs, output_dir, formats=('png',), workers=None):
+    """Render each panel headlessly (Agg) to its own file, in a process pool
+    
+    A panel whose inputs and drawing code hash the same as at the last
+    export to output_dir, and whose files are all there, is skipped.
+    Returns the names of the panels that were rendered
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, EXPORT_MANIFEST)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as file:
+            manifest = json.load(file)
+    
+    jobs = {}
+    for name, message, draw in PANELS:
+        digest = _panel_digest(draw, inputs[name], formats)
+        paths = [os.path.join(output_dir, f"{name}.{fmt}") for fmt in formats]
+        if manifest.get(name) == digest and all(os.path.exists(path) for path in paths):
+            print(f"⏭️  {name} unchanged - skipped")
+            continue
+        jobs[name] = (draw, paths, digest)
     
-    plt.tight_layout()
-    plt.show()
-    
-    print("✅ All visualizations created successfully!")
+    try:
+        if jobs:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_export_worker) as executor:
+                futures = {executor.submit(_render_panel, draw, inputs[name], paths): name
+                           for name, (draw, paths, _) in jobs.items()}
+                for future in as_completed(futures):
+                    name = futures[future]
+                    future.result()
+                    manifest[name] = jobs[name][2]
+                    print(f"🖼️  Saved {', '.join(jobs[name][1])}")
+    finally:
+        # Only panels that were saved get their hash, so a failed one is redone next time
+        temp_path = manifest_path + '.tmp'
+        with open(temp_path, 'w') as file:
+            json.dump(manifest, file, indent=2)
+        os.replace(temp_path, manifest_path)
+    
+    print(f"✅ {len(jobs)} panel(s) rendered, {len(PANELS) - len(jobs)} unchanged, in '{output_dir}'")
+    return list(jobs)
+
+def _panel_digest(draw, data, formats):
+    """Content hash of a panel: its drawing code, its inputs and the requested formats
+    
+    The drawing code includes the helpers and settings every panel shares,
+    so editing any of them renders all panels again
+    """
+    digest = hashlib.sha256()
+    for function in (draw, _render_panel, _display_name, _axis_label, boxplot_from_stats):
+        digest.update(inspect.getsource(function).encode('utf-8'))
+    settings = (SPECIES_COLORS, LINE_POINTS, EXPORT_DPI, PANEL_SIZE)
+    digest.update(pickle.dumps((data, tuple(formats), settings), protocol=4))
+    return digest.hexdigest()
+
+def _init_export_worker():
+    plt.switch_backend('Agg')   # No display needed in the workers
+
+def _render_panel(draw, data, paths):
+    """Draw one panel on its own figure and save it in every requested format"""
+    fig = plt.figure(figsize=PANEL_SIZE)
+    try:
+        draw(data)
+        plt.tight_layout()
+        for path in paths:
+            fig.savefig(path, dpi=EXPORT_DPI)
+    finally:
+        plt.close(fig)
+
+def lttb(x, y, threshold):
+    """Largest-Triangle-Three-Buckets: positions of at most threshold points that keep a line's shape"""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    
+    # The first and last points stay; the rest is cut into threshold - 2 buckets
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x, next_y = x[end:next_end].mean(), y[end:next_end].mean()
+        # Keep the point making the largest triangle with the last kept point and the next bucket's average
+        area = np.abs((x[previous] - next_x) * (y[start:end] - y[previous])
+                      - (x[previous] - x[start:end]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        selected[bucket + 1] = previous
+    return selected
+
+def boxplot_from_stats(ax, stats, columns, labels):
+    """Grouped box plot built from precomputed quartiles instead of the raw rows
+    
+    Whiskers reach 1.5 IQR past the quartiles, clipped to the group's min
+    and max; outliers are not drawn since the rows are not looked at
+    """
+    groups = stats['groups']
+    colors = sns.color_palette(n_colors=len(labels))
+    width = 0.8 / len(labels)
+    for k, (label, color) in enumerate(zip(labels, colors)):
+        boxes = []
+        for col in columns:
+            q1, median, q3 = groups['25%'].loc[label, col], groups['median'].loc[label, col], groups['75%'].loc[label, col]
+            spread = 1.5 * (q3 - q1)
+            boxes.append({
+                'label': col, 'q1': q1, 'med': median, 'q3': q3,
+                'whislo': max(groups['min'].loc[label, col], q1 - spread),
+                'whishi': min(groups['max'].loc[label, col], q3 + spread),
+            })
+        positions = np.arange(len(columns)) + (k - (len(labels) - 1) / 2) * width
+        artists = ax.bxp(boxes, positions=positions, widths=width * 0.9, patch_artist=True,
+                         showfliers=False, manage_ticks=False)
+        for box in artists['boxes']:
+            box.set_facecolor(color)
+        artists['boxes'][0].set_label(label)
+    ax.set_xticks(np.arange(len(columns)))
+    ax.set_xticklabels(columns)
+    ax.set_xlabel('Measurement')
+    ax.set_ylabel('Value')
 
 # Additional Analysis
-def additional_insights(df):
-    """Provide additional insights and observations"""
+def additional_insights(stats, iris=False):
+    """Provide additional insights and observations (the Iris ones only when iris is set)"""
     print("\n🔍 ADDITIONAL INSIGHTS AND OBSERVATIONS")
     print("-" * 40)
     
     # Species distribution
     print("🌿 Species Distribution:")
-    species_counts = df['species'].value_counts()
+    species_counts = stats['group_counts']
     print(species_counts)
     
     # Most distinctive feature
     print("\n🎯 Most Distinctive Feature Between Species:")
-    numerical_cols = ['sepal length (cm)', 'sepal width (cm)', 'petal length (cm)', 'petal width (cm)']
     
-    for col in numerical_cols:
-        variance_ratio = df.groupby('species')[col].std().mean() / df[col].std()
+    for col in stats['columns']:
+        variance_ratio = stats['groups']['std'][col].mean() / stats['describe'].loc['std', col]
         print(f"{col}: Variance ratio = {variance_ratio:.3f}")
     
+    if not iris:
+        return
+    
     # Key observations
     print("\n📝 KEY OBSERVATIONS:")
     print("1. Setosa is clearly separable from other species based on petal measurements")
@@ -223,21 +859,48 @@ def additional_insights(df):
     print("5. Strong correlations exist between petal dimensions")
 
 # Main execution
-def main():
-    """Main function to run the complete analysis"""
+def main(path=None, label_column='species', chunk_rows=CHUNK_ROWS, workers=1, large_data=None, export_dir=None,
+         formats=('png',), export_workers=None, columns=None):
+    """Main function to run the complete analysis (on Iris, or streamed from a CSV/Parquet file)
+    
+    A file is analysed on its numeric columns, or on the given columns
+    
+    With export_dir the charts are saved there by a pool of export_workers
+    processes (all cores by default) instead of shown, so it runs unattended
+    """
+    if export_dir:
+        plt.switch_backend('Agg')
+    visualization_options = dict(large_data=large_data, export_dir=export_dir, formats=formats,
+                                 workers=export_workers)
     try:
+        if path is not None:
+            # Task 1: Stream and explore the file - it is never loaded whole
+            stats = explore_dataset_file(path, label_column, chunk_rows, workers, columns)
+            
+            perform_data_analysis(stats)
+            # Plots are drawn from the per-species sample kept while streaming
+            create_visualizations(stats['sample'], stats, **visualization_options)
+            additional_insights(stats)
+            
+            print("\n🎉 ANALYSIS COMPLETED SUCCESSFULLY!")
+            print("=" * 50)
+            return
+        
         # Task 1: Load and explore data
         df = load_and_explore_data()
         
         if df is not None:
+            # One pass computes the statistics shared by every task below
+            stats = compute_statistics([df])
+            
             # Task 2: Perform data analysis
-            perform_data_analysis(df)
+            perform_data_analysis(stats, iris=True)
             
             # Task 3: Create visualizations
-            create_visualizations(df)
+            create_visualizations(df, stats, **visualization_options)
             
             # Additional insights
-            additional_insights(df)
+            additional_insights(stats, iris=True)
             
             print("\n🎉 ANALYSIS COMPLETED SUCCESSFULLY!")
             print("=" * 50)
@@ -245,7 +908,7 @@ def main():
             # Save the cleaned dataset
             df.to_csv('iris_cleaned_dataset.csv', index=False)
             print("💾 Cleaned dataset saved as 'iris_cleaned_dataset.csv'")
-            
+        
         else:
             print("❌ Failed to load dataset. Analysis cannot proceed.")
     
@@ -256,4 +919,19 @@ def main():
 
 # Run the analysis
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Analyse the Iris dataset, or stream a large CSV/Parquet file")
+    parser.add_argument('path', nargs='?', help="CSV or Parquet file to analyse instead of Iris")
+    parser.add_argument('--label', default='species', help="column holding the group labels")
+    parser.add_argument('--columns', nargs='+', metavar='COLUMN',
+                        help="measurement columns to analyse (default: every numeric column)")
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS, help="rows read per chunk")
+    parser.add_argument('--workers', type=int, default=1, help="processes computing the file statistics")
+    parser.add_argument('--large-data', action=argparse.BooleanOptionalAction, default=None,
+                        help=f"force (or turn off) the large-data charts, used automatically above {LARGE_DATA_ROWS:,} rows")
+    parser.add_argument('--export', metavar='DIR',
+                        help="save each chart to its own file here without a display, skipping unchanged ones")
+    parser.add_argument('--format', nargs='+', choices=['png', 'svg'], default=['png'], help="file formats for --export")
+    parser.add_argument('--export-workers', type=int, help="processes rendering the exported charts (default: all cores)")
+    args = parser.parse_args()
+    main(args.path, args.label, args.chunk_rows, args.workers, args.large_data, args.export, args.format,
+         args.export_workers, args.columns)